@@ -2,17 +2,33 @@ import sys
 import time
 import os
 import re
-import webbrowser
 import subprocess
 import shutil
 import urllib.request
+import http.client
 import urllib.error
 import logging
+import logging.handlers
+import queue
+import random
+import atexit
+import functools
+import json
+import hashlib
+import hmac
+import urllib.parse
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Sequence
 
 from playwright.sync_api import sync_playwright, BrowserContext, Page, Browser
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+try:
+    import psutil  # optional: in-process Edge checks instead of spawning tasklist/taskkill
+except ImportError:
+    psutil = None
 from dotenv import load_dotenv
 import argparse
 
@@ -29,19 +45,33 @@ DEBUG_DIR.mkdir(exist_ok=True)
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 TERMINAL_LOG_FILE = DEBUG_DIR / f"terminal_{timestamp}.log"
 
-# Configure logging to capture all terminal output
+# Configure logging to capture all terminal output. Records are queued and the
+# console/file handlers run on a background listener thread so disk writes never
+# block the caller.
+_LOG_QUEUE: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_LOG_SINKS = [
+    logging.FileHandler(TERMINAL_LOG_FILE, mode='w', encoding='utf-8'),
+    logging.StreamHandler(sys.stdout),
+]
+for _h in _LOG_SINKS:
+    _h.setFormatter(logging.Formatter('%(message)s'))  # Just the raw message for terminal logs
+_LOG_LISTENER = logging.handlers.QueueListener(_LOG_QUEUE, *_LOG_SINKS, respect_handler_level=True)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(message)s',  # Just the raw message for terminal logs
-    handlers=[
-        logging.FileHandler(TERMINAL_LOG_FILE, mode='w', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
+    format='%(message)s',
+    handlers=[logging.handlers.QueueHandler(_LOG_QUEUE)]
 )
-logger = logging.getLogger(__name__)
+_LOG_LISTENER.start()
+atexit.register(_LOG_LISTENER.stop)
+logger = logging.getLogger("rpa")
 # Create html_snapshots directory for saving page content
 HTML_SNAPSHOTS_DIR = PROJECT_ROOT / "html_snapshots"
 LOG_FILE: Optional[Path] = None
+# Single background writer for diagnostic HTML dumps so callers never wait on disk
+_SNAP_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snap")
+# Per-run cap on repeated failure dumps of the same kind (RPA_SNAP_CAP, default 3)
+_SNAP_CAP = int(os.getenv("RPA_SNAP_CAP", "3"))
+_SNAP_COUNTER: Dict[str, int] = defaultdict(int)
 
 # Env-driven URL selection
 DEFAULT_DEMO_URL = os.getenv("DELTA_DEMO_URL", "https://demo.delta.exchange/app/futures/trade/BTC/BTCUSD")
@@ -51,57 +81,159 @@ DELTA_TRADE_URL = os.getenv("DELTA_TRADE_URL") or (DEFAULT_LIVE_URL if ENV_NAME
 CDP_PORT = int(os.getenv("CDP_PORT", "9222"))
 RPA_DIAG = (os.getenv("RPA_DIAG", "0").strip().lower() in ("1", "true", "yes"))
 ORDERS_REQUIRE_CANCEL = (os.getenv("ORDERS_REQUIRE_CANCEL", "0").strip().lower() in ("1", "true", "yes"))
+# Optional Delta REST v2 read path for position and open-orders data (used only when both key and secret are set)
+DELTA_API_KEY = os.getenv("DELTA_API_KEY", "").strip()
+DELTA_API_SECRET = os.getenv("DELTA_API_SECRET", "").strip()
+DELTA_API_BASE = (os.getenv("DELTA_API_BASE") or (
+    "https://api.delta.exchange" if ENV_NAME == "live" else "https://testnet-api.delta.exchange"
+)).rstrip("/")
+DELTA_CONTRACT_VALUE = 0.001  # BTC per BTCUSD contract (lot)
+DELTA_API_ENABLED = bool(DELTA_API_KEY and DELTA_API_SECRET)
+# Debug records are only built and emitted in diagnostic mode
+logger.setLevel(logging.DEBUG if RPA_DIAG else logging.INFO)
 
 # Position monitoring settings
-POSITIONS_INTERVAL = 10  # seconds
+POSITIONS_INTERVAL = float(os.getenv("DELTA_MONITOR_INTERVAL", "10"))  # seconds (ceiling once the position has been quiet for a while)
+POSITIONS_FAST_INTERVAL = 1  # seconds (while size/prices/UPNL are moving)
+POSITIONS_WATCHDOG_INTERVAL = 30  # seconds (ceiling while the positions table is observed for changes)
 ORDERS_INTERVAL = 30     # seconds
+# monitor_positions reads Open Orders from a second tab parked on that tab instead of flipping the main one
+ORDERS_DEDICATED_TAB = (os.getenv("DELTA_ORDERS_TAB", "1").strip().lower() in ("1", "true", "yes"))
 BASE_LOOP_SLEEP = 1      # seconds
 
+# Post-submit probes in place_limit_order, combined so each resolves in one query
+# (filtered to visible matches at the call site, so a hidden early match does not mask a visible one)
+_ORDER_CONFIRM_UNION = (
+    "button:has-text('Confirm'), button:has-text('Yes'), button:has-text('OK'), "
+    "[data-testid*='confirm'], .confirm-button, .modal button:has-text('Confirm')"
+)
+_ORDER_ERROR_UNION = (
+    ".error-message, .alert-error, [role='alert'], .notification.error, .toast.error, "
+    "*:has-text('Error'), *:has-text('Invalid'), *:has-text('Failed')"
+)
+
+# Precompiled patterns shared by the order/position helpers
+_SIZE_NUM_RE = re.compile(r"([+-]?[0-9]*\.?[0-9]+)")
+_ANY_DIGIT_RE = re.compile(r"\d")
+_BTCUSD_WORD_RE = re.compile(r"\bbtcusd\b", re.I)
+_BTC_WORD_RE = re.compile(r"\bbtc\b", re.I)
+_NO_OPEN_ORDERS_RE = re.compile(r"no\s+open\s+orders", re.I)
+_BTCUSD_RE = re.compile(r"btc\s*usd|btcusd", re.I)
+_SIDE_WORD_RE = re.compile(r"\b(buy|sell|long|short)\b", re.I)
+_QTY_UNIT_RE = re.compile(r"\b(btc|contracts?)\b", re.I)
+_USD_RE = re.compile(r"\$|usd", re.I)
+_BTC_RE = re.compile(r"btc", re.I)
+_NON_NUM_RE = re.compile(r"[^0-9\-\.]+")
+_PRICE_CLEAN_RE = re.compile(r"[^0-9\.-]")
+
+
+# Last formatted result timestamp as (epoch second, "YYYY-MM-DD HH:MM:SS")
+_TS_CACHE = (0, "")
+
+
+def _ts_now() -> str:
+    """Local time to the second for result dicts, formatted at most once per second."""
+    global _TS_CACHE
+    t = int(time.time())
+    if t != _TS_CACHE[0]:
+        _TS_CACHE = (t, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)))
+    return _TS_CACHE[1]
 
-def log(msg: str) -> None:
-    """Log a message with RPA prefix to both console and timestamped file."""
-    line = f"[RPA] {msg}"
-    logger.info(line)  # This goes to both console and file
 
+def log(msg: str, *args: Any) -> None:
+    """Log a message with RPA prefix to both console and timestamped file.
 
-def log_error(msg: str) -> None:
+    Optional args are %-formatted lazily by the logging machinery.
+    """
+    logger.info("[RPA] " + msg, *args)  # This goes to both console and file
+
+
+def log_error(msg: str, *args: Any) -> None:
     """Log error messages."""
-    line = f"[RPA] ❌ {msg}"
-    logger.error(line)
+    logger.error("[RPA] ❌ " + msg, *args)
 
 
-def log_debug(msg: str) -> None:
-    """Log debug messages (only when RPA_DIAG is enabled)."""
-    if RPA_DIAG:
-        line = f"[RPA] 🔧 {msg}"
-        logger.debug(line)
+def log_debug(msg: str, *args: Any) -> None:
+    """Log debug messages (only emitted when RPA_DIAG is enabled).
+
+    Pass values as args rather than pre-formatting so nothing is built when disabled.
+    """
+    logger.debug("[RPA] 🔧 " + msg, *args)
+
+
+def diag(msg: str, *args: Any) -> None:
+    """Log a diagnostic line with the caller's own emoji (only emitted when RPA_DIAG is enabled)."""
+    logger.debug("[RPA] " + msg, *args)
 
 
 def set_log_file(path: Path) -> None:
+    """Also append log output to path, through the same background listener as the other sinks.
+
+    The file is opened once here and stays open; log() itself never touches the disk.
+    """
     global LOG_FILE
+    if LOG_FILE == path:
+        return
     LOG_FILE = path
+    try:
+        fh = logging.FileHandler(path, mode="a", encoding="utf-8")
+    except OSError as e:
+        log(f"⚠️ Could not open log file {path}: {e}")
+        return
+    fh.setFormatter(logging.Formatter('%(message)s'))
+    _LOG_LISTENER.handlers = (*_LOG_LISTENER.handlers, fh)
 
 
+@functools.lru_cache(maxsize=1)
 def ensure_debug_dir() -> Path:
     debug_dir = PROJECT_ROOT / "debuuug"
     debug_dir.mkdir(exist_ok=True)
     return debug_dir
 
 
+@functools.lru_cache(maxsize=1)
 def ensure_html_snapshots_dir() -> Path:
-    """Ensure html_snapshots directory exists"""
+    """Ensure html_snapshots directory exists (created once per run)"""
     HTML_SNAPSHOTS_DIR.mkdir(exist_ok=True)
     return HTML_SNAPSHOTS_DIR
 
 
+def _write_text_file(path: str, content: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def _save_diag_html(filename: str, content: str) -> str:
+    """Queue a diagnostic HTML dump (debuuug/ if present, else CWD) and return its path."""
+    if os.path.exists("debuuug"):
+        snap_path = os.path.join("debuuug", filename)
+    else:
+        snap_path = filename
+    _SNAP_POOL.submit(_write_text_file, snap_path, content)
+    return snap_path
+
+
+def _snapshot_allowed(key: str) -> bool:
+    """Count a diagnostic dump under key; False once RPA_SNAP_CAP is reached this run."""
+    if _SNAP_COUNTER[key] >= _SNAP_CAP:
+        return False
+    _SNAP_COUNTER[key] += 1
+    return True
+
+
 def save_dom_snapshot(page: Page, label: str = "snapshot") -> Optional[Path]:
-    """Save the page's HTML to html_snapshots for debugging."""
+    """Queue the page's HTML for html_snapshots (at most RPA_SNAP_CAP per label per run).
+
+    page.content() is read here; the file write happens on the background snapshot thread.
+    """
+    if not _snapshot_allowed(f"dom_{label}"):
+        return None
     try:
         ensure_html_snapshots_dir()
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
         p = HTML_SNAPSHOTS_DIR / f"{label}_{ts}.html"
         content = page.content()
-        p.write_text(content, encoding="utf-8")
+        _SNAP_POOL.submit(_write_text_file, str(p), content)
         log(f"🧾 Saved DOM snapshot: {p}")
         return p
     except Exception as e:
@@ -109,25 +241,49 @@ def save_dom_snapshot(page: Page, label: str = "snapshot") -> Optional[Path]:
         return None
 
 
+# Keep-alive connection per CDP port for repeated /json/version probes
+_CDP_PROBE_CONNS: Dict[int, http.client.HTTPConnection] = {}
+
+
 def is_cdp_available(port: int) -> bool:
-    url = f"http://127.0.0.1:{port}/json/version"
-    try:
-        with urllib.request.urlopen(url, timeout=1) as resp:
+    # A reused connection may have been dropped by the browser; retry once on a fresh one
+    for _ in range(2):
+        conn = _CDP_PROBE_CONNS.get(port)
+        fresh = conn is None
+        if fresh:
+            conn = _CDP_PROBE_CONNS[port] = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+        try:
+            conn.request("GET", "/json/version")
+            resp = conn.getresponse()
+            resp.read()
             return resp.status == 200
-    except Exception:
-        return False
+        except Exception:
+            conn.close()
+            _CDP_PROBE_CONNS.pop(port, None)
+            if fresh:
+                return False
+    return False
 
 
-def start_edge_with_cdp(target_url: str, port: int) -> bool:
-    """Attempt to start Microsoft Edge with remote debugging. Returns True if process launch didn't raise."""
-    candidates = [
-        r"C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe",
-        r"C:\\Program Files\\Microsoft\\Edge\\Application\\msedge.exe",
-    ]
-    edge_path = next((p for p in candidates if os.path.exists(p)), None)
+_EDGE_CANDIDATES = (
+    r"C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe",
+    r"C:\\Program Files\\Microsoft\\Edge\\Application\\msedge.exe",
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_edge_path() -> Optional[str]:
+    """First installed msedge.exe candidate, else msedge on PATH; resolved once per run."""
+    edge_path = next((p for p in _EDGE_CANDIDATES if os.path.exists(p)), None)
     if edge_path is None:
         # Fallback to PATH-resolved msedge
         edge_path = shutil.which("msedge")
+    return edge_path
+
+
+def start_edge_with_cdp(target_url: str, port: int) -> bool:
+    """Attempt to start Microsoft Edge with remote debugging. Returns True if process launch didn't raise."""
+    edge_path = _resolve_edge_path()
     if edge_path is None:
         log("⚠️ Could not locate msedge.exe automatically.")
         return False
@@ -139,7 +295,17 @@ def start_edge_with_cdp(target_url: str, port: int) -> bool:
         return False
 
 
+def _edge_procs() -> list:
+    """msedge.exe processes via psutil (only called when psutil is installed)."""
+    return [p for p in psutil.process_iter(["name"]) if (p.info.get("name") or "").lower() == "msedge.exe"]
+
+
 def edge_running() -> bool:
+    if psutil is not None:
+        try:
+            return bool(_edge_procs())
+        except Exception:
+            pass
     try:
         proc = subprocess.run([
             "tasklist", "/FI", "IMAGENAME eq msedge.exe", "/FO", "CSV", "/NH"
@@ -151,6 +317,16 @@ def edge_running() -> bool:
 
 
 def kill_edge_processes() -> None:
+    if psutil is not None:
+        try:
+            for p in _edge_procs():
+                try:
+                    p.kill()
+                except Exception:
+                    pass
+            return
+        except Exception:
+            pass
     try:
         subprocess.run(["taskkill", "/IM", "msedge.exe", "/F", "/T"], capture_output=True, text=True, check=False)
     except Exception:
@@ -158,17 +334,144 @@ def kill_edge_processes() -> None:
 
 
 def wait_for_cdp(port: int, timeout_s: int = 15) -> bool:
+    """Probe the CDP endpoint with exponential backoff (50ms doubling to 1s) until it answers or timeout_s passes."""
     deadline = time.time() + timeout_s
-    while time.time() < deadline:
+    delay = 0.05
+    while True:
         if is_cdp_available(port):
             return True
-        time.sleep(0.5)
-    return False
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 1.0)
+
+
+def _wait_edge_exit(timeout_s: float = 3.0) -> None:
+    """After kill_edge_processes, wait (with backoff) until no msedge.exe is left, up to timeout_s."""
+    deadline = time.time() + timeout_s
+    delay = 0.05
+    while edge_running() and time.time() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+
+# Cell scraping done in-page: each cell becomes [trimmed innerText, "|"-joined lower-cased
+# data-title/aria-label/title/data-column/data-col values]
+_CELLS_JS_FN = """
+const cellsOf = r => [...r.querySelectorAll('th, td')].map(td => [
+  (td.innerText || '').trim(),
+  ['data-title', 'aria-label', 'title', 'data-column', 'data-col']
+    .map(a => td.getAttribute(a)).filter(Boolean).join('|').toLowerCase(),
+]);
+"""
+# Rows of a table (tbody rows, else any tr holding a td), capped at max, with its header texts
+# and whether it shows the "No open orders" placeholder
+_TABLE_ROWS_CELLS_JS = """(t, max) => { """ + _CELLS_JS_FN + """
+  let rows = [...t.querySelectorAll('tbody tr')];
+  const tbody = rows.length > 0;
+  if (!tbody) rows = [...t.querySelectorAll('tr')].filter(r => r.querySelector('td'));
+  const headers = [...t.querySelectorAll('thead th')].map(th => (th.textContent || '').trim());
+  const none = /no open orders/i.test(t.innerText || '');
+  return { tbody, headers, none, rows: rows.slice(0, max).map(cellsOf) };
+}"""
+# Mark price from the instrument header
+_MARK_PRICE_EXPR = "(document.querySelector('[data-testid=\"mark-price\"]') || {}).innerText || null"
+# The BTCUSD positions row (a td naming it, else any text in the row), scrolled into view,
+# with its cells, its table's header texts and the header mark price; null when there is no such row.
+# The row found last time is kept on window and reused while it is attached and still names BTCUSD.
+_POSITION_ROW_JS = """() => { """ + _CELLS_JS_FN + """
+  const re = /btcusd/i;
+  let row = window.__rpaPositionRow;
+  if (!(row && row.isConnected && re.test(row.innerText || ''))) {
+    const rows = [...document.querySelectorAll('tr')];
+    row = rows.find(r => [...r.querySelectorAll('td')].some(td => re.test(td.innerText || '')))
+      || rows.find(r => re.test(r.innerText || ''));
+    window.__rpaPositionRow = row || null;
+  }
+  if (!row) return null;
+  try { row.scrollIntoView({ block: 'nearest' }); } catch (e) {}
+  const table = row.closest('table');
+  const headers = table ? [...table.querySelectorAll('thead th')].map(th => (th.textContent || '').trim()) : [];
+  return { headers, cells: cellsOf(row), mark: """ + _MARK_PRICE_EXPR + """ };
+}"""
+
+
+# Cell attribute labels (lower-cased) naming each position field, as one alternation
+_POSITION_LABEL_RE = re.compile(
+    r"(?P<size>size)|(?P<entry_price>entry price|avg price)|(?P<mark_price>mark price)"
+    r"|(?P<upnl>upnl|unrealized|unrealised)"
+)
+# Header keywords per field, tried in order; a field maps to the first header containing one
+_HEADER_KEYS = {
+    "position": {
+        "size": ("size",),
+        "entry_price": ("entry price", "avg price"),
+        "mark_price": ("mark price",),
+        "upnl": ("upnl", "unrealized", "unrealised"),
+    },
+    "orders": {
+        "symbol": ("symbol", "instrument", "market", "contract"),
+        "side": ("side", "direction"),
+        "qty": ("qty", "quantity"),
+        "size": ("size", "amount"),
+        "price": ("price", "limit price", "order price"),
+        "type": ("type", "order type"),
+    },
+}
+# (table kind, header texts) -> {field: column index or None}; headers rarely change between polls
+_TABLE_SCHEMA_CACHE: Dict[tuple, Dict[str, Optional[int]]] = {}
+
+
+def _header_schema(kind: str, headers: Sequence[str]) -> Dict[str, Optional[int]]:
+    """Column index per _HEADER_KEYS[kind] field for this header row, parsed once per distinct header row."""
+    key = (kind, tuple(headers))
+    cols = _TABLE_SCHEMA_CACHE.get(key)
+    if cols is None:
+        header_map: Dict[str, int] = {(h or "").strip().lower(): i for i, h in enumerate(headers)}
+        cols = {}
+        for field, keys in _HEADER_KEYS[kind].items():
+            cols[field] = next((i for k in keys for h, i in header_map.items() if k in h), None)
+        _TABLE_SCHEMA_CACHE[key] = cols
+    return cols
+
+
+# (table kind, cell labels) -> {field: indices of cells whose label contains one of its keys}
+_LABEL_SCHEMA_CACHE: Dict[tuple, Dict[str, tuple]] = {}
+
+
+def _label_schema(kind: str, labels: Sequence[str]) -> Dict[str, tuple]:
+    """Candidate cell indices per _HEADER_KEYS[kind] field from the cells' attribute labels.
+
+    Rows of one table share their labels, so this is worked out once per distinct label tuple.
+    """
+    key = (kind, tuple(labels))
+    idx = _LABEL_SCHEMA_CACHE.get(key)
+    if idx is None:
+        idx = {
+            field: tuple(j for j, lab in enumerate(labels) if any(k in lab for k in keys))
+            for field, keys in _HEADER_KEYS[kind].items()
+        }
+        _LABEL_SCHEMA_CACHE[key] = idx
+    return idx
+
+
+_POSITION_FIELDS = ("size", "entry_price", "mark_price", "upnl")
+# (header texts, cell labels) of a BTCUSD row -> {field: cell index} that mapped it last time
+_POSITION_LAYOUT_CACHE: Dict[tuple, Dict[str, int]] = {}
+# Last-resort per-field selectors, scoped to the BTCUSD row
+_POSITION_ROW_SEL = "tr:has(td:has-text('BTCUSD'))"
+_POSITION_FALLBACK_SELS = {
+    "size": ("td:has([class*='size'])",),
+    "entry_price": ("td:has([class*='entry'])", "td:has([data-title*='Entry'])"),
+    "mark_price": ("td:has([class*='mark'])", "td:has([data-title*='Mark'])"),
+    "upnl": ("td:has-text('UPNL')", "td:has([class*='pnl'])"),
+}
 
 
 def extract_position_data(page: Page) -> Dict[str, Any]:
     """Extract position data from the Positions table row for BTCUSD"""
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    ts = _ts_now()
     result: Dict[str, Any] = {
         "size": None,
         "entry_price": None,
@@ -180,191 +483,131 @@ def extract_position_data(page: Page) -> Dict[str, Any]:
     }
 
     try:
-        # Ensure Positions tab is active
-        _activate_tab(page, r"^Positions$")
-        try:
-            page.wait_for_timeout(150)
-        except Exception:
-            pass
+        # Ensure Positions tab is active; only a real tab switch needs time to render
+        if _ACTIVE_TAB.get(id(page)) != "Positions":
+            _ensure_tab(page, "Positions")
+            try:
+                page.wait_for_timeout(150)
+            except Exception:
+                pass
 
-        # Find BTCUSD row
-        row = page.locator("tr:has(td:has-text('BTCUSD'))").first
-        if row.count() == 0:
-            row = page.locator("tr:has(:text('BTCUSD'))").first
-        if row.count() == 0:
+        # Find the BTCUSD row and read its headers and cells (text, attribute-derived labels)
+        # in a single in-page scan instead of a locator round-trip per step
+        found = page.evaluate(_POSITION_ROW_JS)
+        if not found:
             save_dom_snapshot(page, label="positions_not_found")
             return result
-
-        try:
-            row.scroll_into_view_if_needed(timeout=1000)
-        except Exception:
-            pass
-
-        # Collect headers if present
-        table = row.locator("xpath=ancestor::table[1]")
-        headers: List[str] = []
-        try:
-            ths = table.locator("thead th")
-            headers = [t.strip() for t in ths.all_text_contents()] if ths.count() > 0 else []
-        except Exception:
-            headers = []
-        # Build cell list (th+td) and collect helpful attributes
-        cells = row.locator("th, td")
-        cell_count = 0
-        try:
-            cell_count = cells.count()
-        except Exception:
-            cell_count = 0
-
-        cell_texts: List[str] = []
-        cell_labels: List[str] = []
-        for i in range(cell_count):
-            td = cells.nth(i)
-            # Text content
-            try:
-                txt = (td.inner_text(timeout=800) or "").strip()
-            except Exception:
-                txt = ""
-            cell_texts.append(txt)
-            # Attribute-derived labels
-            labels: List[str] = []
-            for attr in ("data-title", "aria-label", "title", "data-column", "data-col"):
-                try:
-                    v = td.get_attribute(attr)
-                    if v:
-                        labels.append(v)
-                except Exception:
-                    pass
-            cell_labels.append("|".join(l.lower() for l in labels))
+        headers: List[str] = found.get("headers") or []
+        cells = found.get("cells") or []
+        cell_texts: List[str] = [c[0] for c in cells]
+        cell_labels: List[str] = [c[1] for c in cells]
 
     # One-time diagnostic dump (only in diagnostic mode)
         if RPA_DIAG and not getattr(extract_position_data, "_row_dumped", False):
             log("🧩 Row cells index dump: " + " | ".join([f"[{i}] {t}" for i, t in enumerate(cell_texts)]))
             setattr(extract_position_data, "_row_dumped", True)
 
-        # Direct attribute-based lookup first
-        def pick_by_label(names: List[str]) -> Optional[str]:
-            keys = [n.lower() for n in names]
-            for i, lab in enumerate(cell_labels):
-                for k in keys:
-                    if k in lab:
-                        val = (cell_texts[i] or "").strip()
-                        if val:
-                            return val
-            return None
-
-        result["size"] = result["size"] or pick_by_label(["size"])   
-        result["entry_price"] = result["entry_price"] or pick_by_label(["entry price", "avg price"]) 
-        result["mark_price"] = result["mark_price"] or pick_by_label(["mark price"]) 
-        result["upnl"] = result["upnl"] or pick_by_label(["upnl", "unrealized", "unrealised"]) 
+        # Cell index each field was read from, so the layout can be replayed on later polls
+        picked: Dict[str, int] = {}
+
+        def take(field: str, j: int) -> None:
+            if result[field] is None and 0 <= j < len(cell_texts):
+                v = (cell_texts[j] or "").strip()
+                if v:
+                    result[field] = v
+                    picked[field] = j
+
+        def unmapped() -> bool:
+            return any(result[k] is None for k in _POSITION_FIELDS)
+
+        # A row layout seen before maps straight to the cell indices that worked last time
+        layout_key = (tuple(headers), tuple(cell_labels))
+        for field, j in _POSITION_LAYOUT_CACHE.get(layout_key, {}).items():
+            take(field, j)
+
+        # Direct attribute-based lookup first: one pass over the cell labels with a combined
+        # pattern; each field takes the first non-empty cell whose label names it
+        if unmapped():
+            for j, lab in enumerate(cell_labels):
+                if not lab:
+                    continue
+                for m in _POSITION_LABEL_RE.finditer(lab):
+                    take(m.lastgroup, j)
 
         # Try symbol-relative mapping if symbol text exists in same row
-        if any(v is None for v in (result["size"], result["entry_price"], result["mark_price"], result["upnl"])):
-            sym_idx = next((i for i, t in enumerate(cell_texts) if re.search(r"\bbtcusd\b", t or "", re.I)), -1)
+        if unmapped():
+            sym_idx = next((i for i, t in enumerate(cell_texts) if _BTCUSD_WORD_RE.search(t or "")), -1)
             if sym_idx != -1:
-                def get_rel(offset: int) -> Optional[str]:
-                    j = sym_idx + offset
-                    if 0 <= j < len(cell_texts):
-                        v = (cell_texts[j] or "").strip()
-                        return v or None
-                    return None
                 # Offsets from earlier screenshot
-                result["size"] = result["size"] or get_rel(1)
-                result["entry_price"] = result["entry_price"] or get_rel(3)
-                result["mark_price"] = result["mark_price"] or get_rel(6)
-                result["upnl"] = result["upnl"] or get_rel(10)
+                for field, offset in (("size", 1), ("entry_price", 3), ("mark_price", 6), ("upnl", 10)):
+                    take(field, sym_idx + offset)
 
         # Heuristic for the observed layout where [3] == "Add"
-        if any(v is None for v in (result["size"], result["entry_price"], result["mark_price"], result["upnl"])) and len(cell_texts) >= 10:
+        if unmapped() and len(cell_texts) >= 10:
             token = (cell_texts[3] or "").lower()
             if "add" in token:
-                result["size"] = result["size"] or (cell_texts[0] or None)
-                result["entry_price"] = result["entry_price"] or (cell_texts[2] or None)
-                result["mark_price"] = result["mark_price"] or (cell_texts[5] or None)
-                result["upnl"] = result["upnl"] or (cell_texts[9] or None)
+                for field, j in (("size", 0), ("entry_price", 2), ("mark_price", 5), ("upnl", 9)):
+                    take(field, j)
 
         # Header-aligned mapping using Size as anchor
-        if any(result[k] is None for k in ("size", "entry_price", "mark_price", "upnl")) and headers:
-            header_map: Dict[str, int] = {h.lower(): i for i, h in enumerate(headers)}
-
-            def hidx(keys: List[str]) -> Optional[int]:
-                for k in keys:
-                    kk = k.lower()
-                    for h, i in header_map.items():
-                        if kk in h:
-                            return i
-                return None
+        if unmapped() and headers:
+            cols = _header_schema("position", headers)
 
             # Find index of Size header and the matching cell index
-            size_h = hidx(["size"])
-            size_c = None
+            size_h = cols["size"]
             # Prefer attribute label match
-            for i, lab in enumerate(cell_labels):
-                if "size" in lab:
-                    size_c = i
-                    break
+            size_c = next(iter(_label_schema("position", cell_labels)["size"]), None)
             # Fallback: look for BTC unit in text (e.g., "+0.001 BTC")
             if size_c is None:
                 for i, txt in enumerate(cell_texts):
-                    if re.search(r"\bbtc\b", txt or "", re.I):
+                    if _BTC_WORD_RE.search(txt or ""):
                         size_c = i
                         break
 
             if size_h is not None and size_c is not None:
                 shift = size_c - size_h
-
-                def val_by_header(keys: List[str]) -> Optional[str]:
-                    hi = hidx(keys)
-                    if hi is None:
-                        return None
-                    j = hi + shift
-                    if 0 <= j < len(cell_texts):
-                        v = (cell_texts[j] or "").strip()
-                        return v or None
-                    return None
-
-                result["size"] = result["size"] or val_by_header(["size"])
-                result["entry_price"] = result["entry_price"] or val_by_header(["entry price", "avg price"])
-                result["mark_price"] = result["mark_price"] or val_by_header(["mark price"])
-                result["upnl"] = result["upnl"] or val_by_header(["upnl", "unrealized", "unrealised"])        
-
-        # Scoped fuzzy fallback
-        def first_text_scoped(selectors: List[str]) -> Optional[str]:
-            for sel in selectors:
-                try:
-                    loc = row.locator(sel).first
-                    if loc.count() == 0:
+                for field, hi in cols.items():
+                    if hi is not None:
+                        take(field, hi + shift)
+
+        if picked:
+            _POSITION_LAYOUT_CACHE[layout_key] = picked
+
+        # Header mark price came back with the row scan; prefer it over another locator probe
+        result["mark_price"] = result["mark_price"] or found.get("mark")
+
+        # Scoped fuzzy fallback, only for fields the cell mappings above left empty;
+        # the row and per-field locators are built once per page and reused across polls
+        missing = [f for f in _POSITION_FALLBACK_SELS if result[f] is None]
+        if missing:
+            row = _cached_locator(page, _POSITION_ROW_SEL)
+
+            def first_text_scoped(field: str, selectors: Sequence[str]) -> Optional[str]:
+                # The selector that last yielded this field is tried first and re-remembered on success
+                action = f"position_{field}"
+                for sel in _known_good_first(action, selectors):
+                    try:
+                        # One round-trip per probe; a missing cell just times out quickly
+                        loc = _SELECTOR_CACHE.get((id(page), _POSITION_ROW_SEL, sel))
+                        if loc is None:
+                            loc = _SELECTOR_CACHE.setdefault((id(page), _POSITION_ROW_SEL, sel), row.locator(sel).first)
+                        txt = (loc.inner_text(timeout=250) or "").strip()
+                        if txt:
+                            _remember_selector(action, sel)
+                            return txt
+                    except Exception:
                         continue
-                    txt = (loc.inner_text(timeout=800) or "").strip()
-                    if txt:
-                        return txt
-                except Exception:
-                    continue
-            return None
-        if result["size"] is None:
-            result["size"] = first_text_scoped(["td:has([class*='size'])"])
-        if result["entry_price"] is None:
-            result["entry_price"] = first_text_scoped(["td:has([class*='entry'])", "td:has([data-title*='Entry'])"])
-        if result["mark_price"] is None:
-            result["mark_price"] = first_text_scoped(["td:has([class*='mark'])", "td:has([data-title*='Mark'])"])
-        if result["upnl"] is None:
-            result["upnl"] = first_text_scoped(["td:has-text('UPNL')", "td:has([class*='pnl'])"])
+                return None
+            for field in missing:
+                result[field] = first_text_scoped(field, _POSITION_FALLBACK_SELS[field])
 
         # Post-processing: derive has_position and side from size text
         size_txt = result.get("size") or ""
         if size_txt:
             # Detect numeric presence in size (e.g., +0.001 BTC or -0.001 BTC)
-            if re.search(r"[0-9]", size_txt):
+            if _ANY_DIGIT_RE.search(size_txt):
                 result["has_position"] = True
-            st = size_txt.strip().lower()
-            if st.startswith("+"):
-                result["side"] = "long"
-            elif st.startswith("-"):
-                result["side"] = "short"
-            elif "long" in st:
-                result["side"] = "long"
-            elif "short" in st:
-                result["side"] = "short"
+            result["side"] = _infer_position_side(size_txt)
         return result
 
     except Exception as e:
@@ -374,6 +617,158 @@ def extract_position_data(page: Page) -> Dict[str, Any]:
         return result
 
 
+# Short-lived combined snapshot per page: (monotonic ts, {'position': ..., 'orders': ...})
+_STATE_CACHE: Dict[int, tuple] = {}
+STATE_CACHE_TTL = 0.5  # seconds
+
+
+def _invalidate_state_cache(page: Page) -> None:
+    _STATE_CACHE.pop(id(page), None)
+
+
+def extract_position_and_orders(page: Page, ttl_s: float = STATE_CACHE_TTL) -> Dict[str, Any]:
+    """Read Open Orders and the BTCUSD position in one pass, re-using a snapshot younger than ttl_s.
+
+    Orders are read first so the page is left on the Positions tab.
+    Returns: { 'position': extract_position_data(...), 'orders': extract_open_orders(...) }
+    """
+    key = id(page)
+    hit = _STATE_CACHE.get(key)
+    now = time.monotonic()
+    if hit and now - hit[0] < ttl_s:
+        return hit[1]
+    prev_orders = hit[1]["orders"] if hit else {}
+    orders = extract_open_orders(page, sig_hint=prev_orders.get("sig"))
+    position = extract_position_data(page)
+    state = {"position": position, "orders": orders}
+    _STATE_CACHE[key] = (time.monotonic(), state)
+    return state
+
+
+# After a failed request the API is skipped (callers fall back to the page) for a delay that
+# doubles on each consecutive failure, so a dead endpoint doesn't cost a timeout every poll
+_API_BACKOFF_MIN_S = 5.0
+_API_BACKOFF_MAX_S = 120.0
+_API_BACKOFF = {"until": 0.0, "delay": 0.0}
+
+
+def _api_failed() -> None:
+    delay = min(_API_BACKOFF_MAX_S, max(_API_BACKOFF_MIN_S, _API_BACKOFF["delay"] * 2))
+    _API_BACKOFF.update(until=time.monotonic() + delay, delay=delay)
+    log_debug("Delta API backing off for %.0fs", delay)
+
+
+def _delta_api_get(path: str, params: Optional[Dict[str, Any]] = None, signed: bool = False, timeout_s: float = 3.0) -> Optional[Dict[str, Any]]:
+    """GET a Delta REST v2 endpoint and return its decoded 'result' (None on any failure).
+
+    Signed requests use the api-key / timestamp / HMAC-SHA256 signature headers.
+    Returns None without a request while backing off after a failure.
+    """
+    if time.monotonic() < _API_BACKOFF["until"]:
+        return None
+    query = ("?" + urllib.parse.urlencode(params)) if params else ""
+    headers = {"Accept": "application/json", "User-Agent": "delta-rpa-bot"}
+    if signed:
+        ts = str(int(time.time()))
+        payload = "GET" + ts + path + query
+        headers.update({
+            "api-key": DELTA_API_KEY,
+            "timestamp": ts,
+            "signature": hmac.new(DELTA_API_SECRET.encode(), payload.encode(), hashlib.sha256).hexdigest(),
+        })
+    try:
+        req = urllib.request.Request(DELTA_API_BASE + path + query, headers=headers)
+        with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+            body = json.loads(resp.read().decode("utf-8"))
+    except Exception as e:
+        log_debug("Delta API %s failed: %s", path, e)
+        _api_failed()
+        return None
+    if not body.get("success", True):
+        log_debug("Delta API %s error: %s", path, body.get("error"))
+        _api_failed()
+        return None
+    _API_BACKOFF["delay"] = 0.0
+    return body.get("result")
+
+
+# Delta product id per symbol; it never changes, so it is looked up once
+_PRODUCT_IDS: Dict[str, Any] = {}
+
+
+def _product_id(symbol: str, ticker: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+    """Product id for symbol, taken from ticker when given, else fetched once and cached."""
+    pid = _PRODUCT_IDS.get(symbol)
+    if pid is None:
+        if ticker is None:
+            ticker = _delta_api_get(f"/v2/tickers/{symbol}")
+        pid = (ticker or {}).get("product_id")
+        if pid is not None:
+            _PRODUCT_IDS[symbol] = pid
+    return pid
+
+
+def fetch_position_api(symbol: str = "BTCUSD") -> Optional[Dict[str, Any]]:
+    """Read the position over the REST API in the same shape as extract_position_data.
+
+    Returns None when API credentials are not configured or a request fails, so callers
+    can fall back to scraping the page.
+    """
+    if not DELTA_API_ENABLED:
+        return None
+    # The ticker is still needed here for mark_price
+    ticker = _delta_api_get(f"/v2/tickers/{symbol}")
+    pid = _product_id(symbol, ticker) if ticker else None
+    if pid is None:
+        return None
+    pos = _delta_api_get("/v2/positions", {"product_id": pid}, signed=True)
+    if pos is None:
+        return None
+    lots = _safe_float(pos.get("size")) or 0.0
+    entry = _safe_float(pos.get("entry_price"))
+    mark = _safe_float(ticker.get("mark_price"))
+    size_btc = lots * DELTA_CONTRACT_VALUE
+    upnl = size_btc * (mark - entry) if (lots and entry is not None and mark is not None) else None
+    return {
+        "size": f"{size_btc:+.3f} BTC" if lots else None,
+        "entry_price": f"{entry:,.1f}" if lots and entry is not None else None,
+        "mark_price": f"{mark:,.1f}" if mark is not None else None,
+        "upnl": f"{upnl:+,.2f} USD" if upnl is not None else None,
+        "timestamp": _ts_now(),
+        "side": ("long" if lots > 0 else "short") if lots else None,
+        "has_position": bool(lots),
+        "source": "api",
+    }
+
+
+def fetch_open_orders_api(symbol: str = "BTCUSD") -> Optional[Dict[str, Any]]:
+    """Read open orders over the REST API in the same shape as extract_open_orders.
+
+    Returns None when API credentials are not configured or a request fails.
+    """
+    if not DELTA_API_ENABLED:
+        return None
+    pid = _product_id(symbol)
+    if pid is None:
+        return None
+    rows = _delta_api_get("/v2/orders", {"product_ids": pid, "states": "open"}, signed=True)
+    if rows is None:
+        return None
+    orders: List[Dict[str, Any]] = []
+    for o in rows:
+        lots = int(_safe_float(o.get("unfilled_size", o.get("size"))) or 0)
+        side = (o.get("side") or "").lower() or None
+        orders.append({
+            "symbol": o.get("product_symbol") or symbol,
+            "side": side,
+            "qty": f"{'-' if side == 'sell' else '+'}{lots}",
+            "price": o.get("limit_price"),
+            "type": "Limit" if o.get("order_type") == "limit_order" else "Market",
+            "size": f"{lots * DELTA_CONTRACT_VALUE:.3f} BTC",
+        })
+    return {"orders": orders[:2], "timestamp": _ts_now(), "source": "api"}
+
+
 def format_position_display(data: Dict[str, Any]) -> str:
     """Format position data for display"""
     def s(val: Any, fallback: str) -> str:
@@ -398,17 +793,84 @@ def format_position_display(data: Dict[str, Any]) -> str:
 """
 
 
+# Resolved Open Orders table per page; dropped whenever _activate_tab switches tabs
+_ORDERS_TABLE_CACHE: Dict[int, Any] = {}
+# Last parsed orders per page as (raw rows signature, orders) for extract_open_orders(sig_hint=...)
+_ORDERS_RESULT_CACHE: Dict[int, tuple] = {}
+
+
+def _cached_orders_table(page: Page):
+    """Return the remembered Open Orders table locator if it is still visible."""
+    table = _ORDERS_TABLE_CACHE.get(id(page))
+    if table is None:
+        return None
+    try:
+        if table.is_visible():
+            return table
+    except Exception:
+        pass
+    _ORDERS_TABLE_CACHE.pop(id(page), None)
+    return None
+
+
+def _remember_orders_table(page: Page, table) -> None:
+    _ORDERS_TABLE_CACHE[id(page)] = table
+
+
+def _forget_orders_table(page: Page) -> None:
+    _ORDERS_TABLE_CACHE.pop(id(page), None)
+
+
+# Tab we last activated per page (via _ensure_tab); cleared by any other tab switch or navigation
+_ACTIVE_TAB: Dict[int, str] = {}
+_TAB_NAV_HOOKED: set = set()
+_TAB_REGEX = {"Positions": r"^Positions$", "Open Orders": r"^Open\s*Orders$"}
+_TAB_POSITIONS_RE = re.compile(r"positions", re.I)
+_TAB_ORDERS_RE = re.compile(r"orders", re.I)
+_POSITIONS_PREFIX_RE = re.compile(r"^Positions", re.I)
+# Delta's class-based tab strip; once one of these is found on a page the slower role/XPath
+# fallbacks are skipped there (a miss then just means the strip hasn't rendered yet)
+_POSITIONS_TAB_SEL = "css=div.tab.open-positions-tab"
+_ORDERS_TAB_SEL = "css=div.tab.open-orders-tab"
+_TAB_CSS_SEEN: set = set()
+_ORDERS_TAB_XPATH = "xpath=(//button|//div|//a|//span)[(contains(normalize-space(.), 'Open Orders') or contains(normalize-space(.), 'Orders')) and not(@disabled) and not(contains(@class,'disabled'))]"
+
+
+@functools.lru_cache(maxsize=16)
+def _tab_name_re(name_regex: str) -> "re.Pattern[str]":
+    """Compiled, case-insensitive tab name pattern (the handful of tab regexes are compiled once)."""
+    return re.compile(name_regex, re.I)
+
+
+def _ensure_tab(page: Page, name: str) -> bool:
+    """Activate the named tab unless we already did and nothing has switched it since."""
+    key = id(page)
+    if _ACTIVE_TAB.get(key) == name:
+        return True
+    ok = _activate_tab(page, _TAB_REGEX.get(name, f"^{re.escape(name)}$"))
+    if ok:
+        if key not in _TAB_NAV_HOOKED:
+            try:
+                page.on("framenavigated", lambda _frame: _ACTIVE_TAB.pop(key, None))
+                _TAB_NAV_HOOKED.add(key)
+            except Exception:
+                pass
+        _ACTIVE_TAB[key] = name
+    return ok
+
+
 def _activate_tab(page: Page, name_regex: str) -> bool:
     """Try to activate a tab by accessible role name regex. Returns True if a click was attempted or tab already active."""
-    # Priority: explicit class-based tabs per provided HTML
+    _ACTIVE_TAB.pop(id(page), None)
+    # Priority: explicit class-based tabs per provided HTML (locators built once per page)
+    cand = None
     try:
-        if re.search(r"positions", name_regex, re.I):
-            cand = page.locator("css=div.tab.open-positions-tab").first
-        elif re.search(r"orders", name_regex, re.I):
-            cand = page.locator("css=div.tab.open-orders-tab").first
-        else:
-            cand = None
+        if _TAB_POSITIONS_RE.search(name_regex):
+            cand = _cached_locator(page, _POSITIONS_TAB_SEL)
+        elif _TAB_ORDERS_RE.search(name_regex):
+            cand = _cached_locator(page, _ORDERS_TAB_SEL)
         if cand and cand.count() > 0:
+            _TAB_CSS_SEEN.add(id(page))
             try:
                 classes = cand.get_attribute("class") or ""
                 if "active" not in classes:
@@ -416,15 +878,18 @@ def _activate_tab(page: Page, name_regex: str) -> bool:
                         cand.scroll_into_view_if_needed(timeout=800)
                     except Exception:
                         pass
+                    _forget_orders_table(page)
                     cand.click(timeout=1500)
                 return True
             except Exception:
                 pass
     except Exception:
         pass
+    if cand is not None and id(page) in _TAB_CSS_SEEN:
+        return False
     # Role-based fallback
     try:
-        tab = page.get_by_role("tab", name=re.compile(name_regex, re.I)).first
+        tab = page.get_by_role("tab", name=_tab_name_re(name_regex)).first
         if tab and tab.count() > 0:
             sel = (tab.get_attribute("aria-selected") or "").lower()
             if sel == "false":
@@ -432,6 +897,7 @@ def _activate_tab(page: Page, name_regex: str) -> bool:
                     tab.scroll_into_view_if_needed(timeout=800)
                 except Exception:
                     pass
+                _forget_orders_table(page)
                 tab.click(timeout=1500)
                 return True
             return True
@@ -440,12 +906,13 @@ def _activate_tab(page: Page, name_regex: str) -> bool:
     # Fallbacks: try generic clickable with exact text
     try:
         # Try a few variants: 'Open Orders', 'Orders', possibly with count like 'Open Orders (2)'
-        cand = page.locator("xpath=(//button|//div|//a|//span)[(contains(normalize-space(.), 'Open Orders') or contains(normalize-space(.), 'Orders')) and not(@disabled) and not(contains(@class,'disabled'))]").first
-        if cand and cand.count() > 0 and cand.is_visible():
+        cand = _cached_locator(page, _ORDERS_TAB_XPATH)
+        if cand and cand.is_visible():
             try:
                 cand.scroll_into_view_if_needed(timeout=800)
             except Exception:
                 pass
+            _forget_orders_table(page)
             cand.click(timeout=1500)
             return True
     except Exception:
@@ -453,119 +920,147 @@ def _activate_tab(page: Page, name_regex: str) -> bool:
     return False
 
 
-def extract_open_orders(page: Page) -> Dict[str, Any]:
+# Index of the likeliest Open Orders table among the first 10 visible ones (-1 if none):
+# qty/size header +2, price/limit +2, type/side +1, has tbody rows +1, lone 'Load more' row -3
+_SCORE_ORDERS_TABLES_JS = """
+() => {
+  let bi = -1, bs = -1;
+  [...document.querySelectorAll('table')].slice(0, 10).forEach((t, i) => {
+    if (!t.getClientRects().length) return;
+    const h = [...t.querySelectorAll('thead th')].map(th => (th.textContent || '').trim().toLowerCase()).join(',');
+    let s = 0;
+    if (/qty|quantity|size/.test(h)) s += 2;
+    if (/price|limit/.test(h)) s += 2;
+    if (/type|side/.test(h)) s += 1;
+    const rc = t.querySelectorAll('tbody tr').length;
+    if (rc >= 1) s += 1;
+    if (rc <= 1 && (t.innerText || '').toLowerCase().includes('load more')) s -= 3;
+    if (s > bs) { bs = s; bi = i; }
+  });
+  return bi;
+}
+"""
+
+
+# Whitespace the orders table puts inside numbers (line breaks, nbsp, thin spaces)
+_WS_TRANS = str.maketrans("", "", " \t\n\r\f\v\xa0\u2009\u200a\u202f")
+
+
+def _normalize_num_text(t: Optional[str]) -> Optional[str]:
+    """Drop all whitespace from a qty/price cell so newlines and spaces don't split the number."""
+    return t.translate(_WS_TRANS) if t else t
+
+
+def _parse_qty_sign(q: Optional[str]) -> Optional[str]:
+    """'long'/'short' from a qty cell's sign, else from its numeric value; None if neither."""
+    if not q:
+        return None
+    q0 = q.strip()[:1]
+    if q0 == "-":
+        return "short"
+    if q0 == "+":
+        return "long"
+    # Numeric positive/negative fallback
+    try:
+        qn_tmp = float(_NON_NUM_RE.sub("", q))
+        if qn_tmp > 0:
+            return "long"
+        if qn_tmp < 0:
+            return "short"
+    except Exception:
+        pass
+    return None
+
+
+def extract_open_orders(page: Page, sig_hint: Optional[str] = None) -> Dict[str, Any]:
     """Extract up to two open orders for the current instrument (BTCUSD page).
 
-    Returns a dict: { 'orders': [ { 'symbol', 'side', 'price', 'qty', 'type' }, ... ], 'timestamp': ts }
+    Returns a dict: { 'orders': [ { 'symbol', 'side', 'price', 'qty', 'type' }, ... ], 'timestamp': ts, 'sig': str }
+    Pass the previous result's 'sig' as sig_hint to get the previous orders list back
+    without re-parsing when the table rows haven't changed.
     """
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    ts = _ts_now()
     out: Dict[str, Any] = {"orders": [], "timestamp": ts}
 
     try:
-        # Switch to Open Orders tab
-        clicked = _activate_tab(page, r"^Open\s*Orders$")
+        # Switch to Open Orders tab unless this page is already parked there
+        on_tab = _ACTIVE_TAB.get(id(page)) == "Open Orders"
+        clicked = on_tab or _ensure_tab(page, "Open Orders")
         if not clicked:
             # Try sibling fallback near Positions tab
             try:
-                pos = page.get_by_text(re.compile(r"^Positions", re.I)).first
+                pos = page.get_by_text(_POSITIONS_PREFIX_RE).first
                 if pos and pos.count() > 0:
                     container = pos.locator("xpath=ancestor::*[self::div or self::nav or self::section][1]")
                     alt = container.locator("xpath=.//*[contains(normalize-space(.), 'Open Orders') or contains(normalize-space(.), 'Orders')]").first
-                    if alt and alt.count() > 0 and alt.is_visible():
+                    if alt and alt.is_visible():
                         try:
                             alt.scroll_into_view_if_needed(timeout=800)
                         except Exception:
                             pass
+                        _forget_orders_table(page)
                         alt.click(timeout=1500)
                         clicked = True
             except Exception:
                 pass
 
-        # Small wait for table render
-        try:
-            page.wait_for_timeout(300)
-        except Exception:
-            pass
+        # Small wait for table render after a tab switch
+        if not on_tab:
+            try:
+                page.wait_for_timeout(300)
+            except Exception:
+                pass
 
+        # Re-use the table resolved on a previous call while the tab hasn't changed
+        table = _cached_orders_table(page)
+        cached = table is not None
         # Prefer a table anchored under a visible "Open Orders" heading/label (case-insensitive)
-        table = None
         try:
             anchor = page.locator("xpath=(//*[self::h1 or self::h2 or self::h3 or self::div or self::span][contains(translate(normalize-space(.),'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'open orders')])[1]")
-            if anchor and anchor.count() > 0 and anchor.is_visible():
+            if not cached and anchor and anchor.is_visible():
                 cand = anchor.locator("xpath=following::table[1]").first
-                if cand and cand.count() > 0 and cand.is_visible():
+                if cand and cand.is_visible():
                     table = cand
         except Exception:
             pass
 
         if table is None:
-            # Fallback: find a likely Open Orders table by headers and row shape
-            tables = page.locator("table")
+            # Fallback: find a likely Open Orders table by headers and row shape, scoring
+            # the first 10 tables in one in-page pass instead of several probes per table
             try:
-                tcount = min(tables.count(), 10)
+                best_idx = page.evaluate(_SCORE_ORDERS_TABLES_JS)
             except Exception:
-                tcount = 0
-            best_score = -1
-            for i in range(tcount):
-                t = tables.nth(i)
-                if not t.is_visible():
-                    continue
-                try:
-                    ths = t.locator("thead th")
-                    headers = [t2.strip() for t2 in ths.all_text_contents()] if ths.count() > 0 else []
-                except Exception:
-                    headers = []
-                hdr_l = ",".join(h.lower() for h in headers)
-                score = 0
-                if any(k in hdr_l for k in ("qty", "quantity", "size")):
-                    score += 2
-                if any(k in hdr_l for k in ("price", "limit")):
-                    score += 2
-                if any(k in hdr_l for k in ("type", "side")):
-                    score += 1
-                # ensure has at least some data rows
-                rows_vis = t.locator("tbody tr")
-                rc = rows_vis.count() if rows_vis else 0
-                if rc >= 1:
-                    score += 1
-                # de-prioritize tables that contain only 'Load more'
-                try:
-                    body_txt = (t.inner_text(timeout=400) or "").lower()
-                    if "load more" in body_txt and rc <= 1:
-                        score -= 3
-                except Exception:
-                    pass
-                if score > best_score:
-                    best_score = score
-                    table = t
+                best_idx = -1
+            if best_idx is not None and best_idx >= 0:
+                table = page.locator("table").nth(best_idx)
 
         if table is None:
             save_dom_snapshot(page, label="open_orders_not_found")
             return out
-
-        # Read headers
+        if not cached:
+            _remember_orders_table(page, table)
+
+        # Unchanged rows since the caller's last read: hand back the same list
+        rows_sig = _orders_rows_sig(table)
+        out["sig"] = rows_sig
+        if sig_hint is not None and rows_sig == sig_hint:
+            prev = _ORDERS_RESULT_CACHE.get(id(page))
+            if prev and prev[0] == rows_sig:
+                out["orders"] = prev[1]
+                return out
+
+        # Collect the headers and every row's cell texts/labels in one round-trip
         try:
-            ths = table.locator("thead th")
-            headers = [t.strip() for t in ths.all_text_contents()] if ths.count() > 0 else []
+            scraped = table.evaluate(_TABLE_ROWS_CELLS_JS, 12)  # safety cap
         except Exception:
-            headers = []
-        header_map: Dict[str, int] = {(h or '').strip().lower(): i for i, h in enumerate(headers)}
-
-        def hidx(keys: List[str]) -> Optional[int]:
-            for k in keys:
-                kk = (k or '').strip().lower()
-                for h, i in header_map.items():
-                    if kk and kk in h:
-                        return i
-            return None
-
-        # Collect rows
-        rows = table.locator("tbody tr")
-        row_count = rows.count() if rows else 0
-        if row_count == 0:
+            scraped = {"tbody": True, "rows": []}
+        headers: List[str] = scraped.get("headers") or []
+        cols = _header_schema("orders", headers)
+        if scraped.get("tbody"):
+            rows = table.locator("tbody tr")
+        else:
             # Sometimes rows may not be in tbody
             rows = table.locator("tr").filter(has=table.locator("td"))
-            row_count = rows.count() if rows else 0
 
         orders: List[Dict[str, Any]] = []
 
@@ -577,35 +1072,16 @@ def extract_open_orders(page: Page) -> Dict[str, Any]:
                     "css=button.cancel, div.cancel, span.cancel",
                 ]:
                     cand = r.locator(sel).first
-                    if cand and cand.count() > 0 and cand.is_visible():
+                    if cand and cand.is_visible():
                         return True
             except Exception:
                 pass
             return False
 
-        for r_i in range(min(row_count, 12)):  # safety cap
+        for r_i, cells in enumerate(scraped.get("rows") or []):
             row = rows.nth(r_i)
-            # Gather cell texts and labels
-            tds = row.locator("th, td")
-            n = tds.count()
-            cell_texts: List[str] = []
-            cell_labels: List[str] = []
-            for i in range(n):
-                td = tds.nth(i)
-                try:
-                    txt = (td.inner_text(timeout=800) or '').strip()
-                except Exception:
-                    txt = ''
-                cell_texts.append(txt)
-                labels: List[str] = []
-                for attr in ("data-title", "aria-label", "title", "data-column", "data-col"):
-                    try:
-                        v = td.get_attribute(attr)
-                        if v:
-                            labels.append(v)
-                    except Exception:
-                        pass
-                cell_labels.append("|".join(l.lower() for l in labels))
+            cell_texts: List[str] = [c[0] for c in cells]
+            cell_labels: List[str] = [c[1] for c in cells]
 
             # One-time dump for open orders
             if RPA_DIAG and not getattr(extract_open_orders, "_row_dumped", False):
@@ -621,73 +1097,48 @@ def extract_open_orders(page: Page) -> Dict[str, Any]:
                 continue
 
             # Build order record
-            def get_by_header(keys: List[str]) -> Optional[str]:
-                idx = hidx(keys)
+            label_cols = _label_schema("orders", cell_labels)
+
+            def get_by_header(field: str) -> Optional[str]:
+                idx = cols[field]
                 if idx is not None and 0 <= idx < len(cell_texts):
                     v = (cell_texts[idx] or '').strip()
                     if v:
                         return v
                 # try attribute labels
-                keyl = [k.lower() for k in keys]
-                for j, lab in enumerate(cell_labels):
-                    if any(k in lab for k in keyl):
-                        v = (cell_texts[j] or '').strip()
-                        if v:
-                            return v
+                for j in label_cols[field]:
+                    v = (cell_texts[j] or '').strip()
+                    if v:
+                        return v
                 return None
 
-            symbol = get_by_header(["symbol", "instrument", "market", "contract"])
+            symbol = get_by_header("symbol")
             # If symbol isn't explicitly present, infer from row text
             if not symbol:
                 joined = " ".join(cell_texts)
-                m = re.search(r"btc\s*usd|btcusd", joined, re.I)
+                m = _BTCUSD_RE.search(joined)
                 symbol = "BTCUSD" if m else None
 
-            side = get_by_header(["side", "direction"]) or next(
-                (t for t in cell_texts if re.search(r"\b(buy|sell|long|short)\b", t, re.I)), None
+            side = get_by_header("side") or next(
+                (t for t in cell_texts if _SIDE_WORD_RE.search(t)), None
             )
-            # Normalize cell texts for qty/price to collapse newlines and spaces
-            def normalize_num_text(t: Optional[str]) -> Optional[str]:
-                if not t:
-                    return t
-                t2 = re.sub(r"\s+", "", t)  # remove all whitespace
-                return t2
-
-            qty = get_by_header(["qty", "quantity"]) or get_by_header(["size", "amount"]) or next(
-                (t for t in cell_texts if re.search(r"\b(btc|contracts?)\b", t, re.I)), None
+            qty = get_by_header("qty") or get_by_header("size") or next(
+                (t for t in cell_texts if _QTY_UNIT_RE.search(t)), None
             )
-            qty = normalize_num_text(qty)
+            qty = _normalize_num_text(qty)
 
-            price = get_by_header(["price", "limit price", "order price"]) or next(
-                (t for t in cell_texts if re.search(r"\$|usd", t, re.I)), None
+            price = get_by_header("price") or next(
+                (t for t in cell_texts if _USD_RE.search(t)), None
             )
-            price = normalize_num_text(price)
-            otype = get_by_header(["type", "order type"]) or None
+            price = _normalize_num_text(price)
+            otype = get_by_header("type") or None
 
             # Filter to BTCUSD when possible (we're on BTCUSD page)
-            if symbol and not re.search(r"btc\s*usd|btcusd", symbol, re.I):
+            if symbol and not _BTCUSD_RE.search(symbol):
                 continue
 
             # Derive side from qty if needed (sign or numeric value)
-            def parse_qty_sign(q: Optional[str]) -> Optional[str]:
-                if not q:
-                    return None
-                if re.search(r"^-", q.strip()):
-                    return "short"
-                if re.search(r"^\+", q.strip()):
-                    return "long"
-                # Numeric positive/negative fallback
-                try:
-                    qn_tmp = float(re.sub(r"[^0-9\-\.]+", "", q))
-                    if qn_tmp > 0:
-                        return "long"
-                    if qn_tmp < 0:
-                        return "short"
-                except Exception:
-                    pass
-                return None
-
-            derived_side = parse_qty_sign(qty)
+            derived_side = _parse_qty_sign(qty)
             if not side and derived_side:
                 side = derived_side
 
@@ -695,8 +1146,8 @@ def extract_open_orders(page: Page) -> Dict[str, Any]:
             size_btc = None
             try:
                 # Clean qty to number
-                if qty and not re.search(r"btc", qty, re.I):
-                    qn_val = float(re.sub(r"[^0-9\-\.]+", "", qty))
+                if qty and not _BTC_RE.search(qty):
+                    qn_val = float(_NON_NUM_RE.sub("", qty))
                     size_btc = f"{abs(qn_val)/1000:.3f} BTC"
             except Exception:
                 size_btc = None
@@ -715,21 +1166,14 @@ def extract_open_orders(page: Page) -> Dict[str, Any]:
 
         out["orders"] = orders[:2]
         # If we still think there are orders but the section text says none, clear them
-        try:
-            table_txt = (table.inner_text(timeout=400) or "").lower()
-            if "no open orders" in table_txt and len(out["orders"]) > 0:
-                out["orders"] = []
-        except Exception:
-            pass
+        if scraped.get("none") and len(out["orders"]) > 0:
+            out["orders"] = []
         # Diagnostics when none detected
         if RPA_DIAG and len(out["orders"]) == 0:
-            try:
-                ths = table.locator("thead th")
-                headers = [t.strip() for t in ths.all_text_contents()] if ths.count() > 0 else []
-            except Exception:
-                headers = []
             log(f"🔎 Open Orders: 0 rows parsed. Headers={headers}")
             save_dom_snapshot(page, label="open_orders_zero")
+        if rows_sig is not None:
+            _ORDERS_RESULT_CACHE[id(page)] = (rows_sig, out["orders"])
         return out
     except Exception as e:
         log(f"Error extracting open orders: {e}")
@@ -738,20 +1182,17 @@ def extract_open_orders(page: Page) -> Dict[str, Any]:
         return out
 
 
-def _select_order_side(page: Page, side: str) -> bool:
-    """Select Buy|Long or Sell|Short in the order panel. Returns True if a click was attempted or already active.
+def _click(loc, timeout: int = 1500) -> None:
+    """Click relying on Playwright's built-in scroll-into-view; scroll explicitly only if that fails."""
+    try:
+        loc.click(timeout=timeout)
+    except Exception:
+        loc.scroll_into_view_if_needed(timeout=800)
+        loc.click(timeout=timeout)
 
-    side: 'buy'/'long' or 'sell'/'short'
-    """
-    side_l = (side or "").strip().lower()
-    want_buy = side_l in ("buy", "long")
-    target_text = "Buy | Long" if want_buy else "Sell | Short"
-    
-    if RPA_DIAG:
-        log(f"🔧 _select_order_side: looking for '{target_text}'")
-    
-    # Try multiple selectors for side selection
-    side_selectors = [
+
+def _side_selectors(target_text: str) -> tuple:
+    return (
         # Specific class-based selectors
         f"div.style--IHeIe.style--RvHLs:has-text('{target_text}')",
         # Text-based selectors
@@ -762,22 +1203,34 @@ def _select_order_side(page: Page, side: str) -> bool:
         f"[role='button']:has-text('{target_text}')",
         f"[role='tab']:has-text('{target_text}')",
         # XPath fallback
-        f"xpath=(//div|//button|//span)[contains(normalize-space(.), '{target_text}')]"
-    ]
+        f"xpath=(//div|//button|//span)[contains(normalize-space(.), '{target_text}')]",
+    )
+
+
+# Side toggle selectors, formatted once per side (keyed by want_buy)
+_SIDE_SELECTORS = {True: _side_selectors("Buy | Long"), False: _side_selectors("Sell | Short")}
+
+
+def _select_order_side(page: Page, side: str) -> bool:
+    """Select Buy|Long or Sell|Short in the order panel. Returns True if a click was attempted or already active.
+
+    side: 'buy'/'long' or 'sell'/'short'
+    """
+    side_l = (side or "").strip().lower()
+    want_buy = side_l in ("buy", "long")
+    target_text = "Buy | Long" if want_buy else "Sell | Short"
     
-    for selector in side_selectors:
+    log_debug("_select_order_side: looking for '%s'", target_text)
+    
+    for selector in _SIDE_SELECTORS[want_buy]:
         try:
-            if "xpath=" in selector:
-                cand = page.locator(selector).first
-            else:
-                cand = page.locator(selector).first
-                
-            if cand and cand.count() > 0 and cand.is_visible():
+            cand = page.locator(selector).first
+            if cand and cand.is_visible():
                 if RPA_DIAG:
-                    log(f"🔧 Found side selector with: {selector}")
+                    diag("🔧 Found side selector with: %s", selector)
                     try:
                         classes = cand.get_attribute("class") or ""
-                        log(f"🔧 Side element classes: {classes}")
+                        diag("🔧 Side element classes: %s", classes)
                     except Exception:
                         pass
                 
@@ -785,36 +1238,28 @@ def _select_order_side(page: Page, side: str) -> bool:
                     classes = cand.get_attribute("class") or ""
                     # If it looks already selected, skip clicking but return success
                     if "active" in classes or "selected" in classes:
-                        if RPA_DIAG:
-                            log(f"🔧 Side already selected (has active/selected class)")
+                        log_debug("Side already selected (has active/selected class)")
                         return True
                         
-                    cand.scroll_into_view_if_needed(timeout=800)
-                    cand.click(timeout=1500)
-                    if RPA_DIAG:
-                        log(f"🔧 Clicked side selector successfully")
+                    _click(cand, timeout=1500)
+                    log_debug("Clicked side selector successfully")
                     return True
                 except Exception as e:
-                    if RPA_DIAG:
-                        log(f"🔧 Side selector click failed: {e}")
+                    log_debug("Side selector click failed: %s", e)
                     continue
         except Exception as e:
-            if RPA_DIAG:
-                log(f"🔧 Side selector {selector} failed: {e}")
+            log_debug("Side selector %s failed: %s", selector, e)
             continue
     
     if RPA_DIAG:
-        log(f"❌ No side selector found for '{target_text}'")
+        diag("❌ No side selector found for '%s'", target_text)
+        if not _snapshot_allowed(f"side_not_found_{target_text}"):
+            return True
         # Take a diagnostic snapshot
         try:
             snap_filename = f"side_not_found_{target_text.replace(' | ', '_').lower()}_{int(time.time())}.html"
-            if os.path.exists("debuuug"):
-                snap_path = os.path.join("debuuug", snap_filename)
-            else:
-                snap_path = snap_filename
-            with open(snap_path, "w", encoding="utf-8") as f:
-                f.write(page.content())
-            log(f"🔍 Saved DOM snapshot: {snap_path}")
+            snap_path = _save_diag_html(snap_filename, page.content())
+            diag("🔍 Saved DOM snapshot: %s", snap_path)
         except Exception:
             pass
     
@@ -855,19 +1300,11 @@ def _ensure_maker_only(page: Page, enabled: bool = True) -> bool:
         if state is None:
             # If unknown, click once when enabling to bias to ON
             if enabled:
-                try:
-                    cand.scroll_into_view_if_needed(timeout=800)
-                except Exception:
-                    pass
-                cand.click(timeout=1500)
+                _click(cand, timeout=1500)
                 return True
             return True  # leave as-is when disabling and unknown
         if state != enabled:
-            try:
-                cand.scroll_into_view_if_needed(timeout=800)
-            except Exception:
-                pass
-            cand.click(timeout=1500)
+            _click(cand, timeout=1500)
             time.sleep(0.1)
             return True
         return True
@@ -876,32 +1313,27 @@ def _ensure_maker_only(page: Page, enabled: bool = True) -> bool:
 
 
 def _select_order_type(page: Page, type_name: str = "Limit") -> bool:
-    """Select order type (e.g., 'Limit' or 'Market'). Best-effort with multiple selectors."""
+    """Select order type (e.g., 'Limit' or 'Market') via a role-based lookup of the option."""
     try:
-        # Click order type dropdown/area if needed, then click desired type
-        # Try to find a visible control with current type text
-        cur = page.locator("xpath=(//button|//div|//span)[contains(normalize-space(.), 'Limit') or contains(normalize-space(.), 'Market')]").first
-        try:
-            if cur and cur.count() > 0 and cur.is_visible():
-                cur.click(timeout=800)
-                time.sleep(0.1)
-        except Exception:
-            pass
-        # Now click the desired type in the menu/list
-        candidates = [
-            f"button:has-text('{type_name}')",
-            f"[role='menuitem']:has-text('{type_name}')",
-            f"li:has-text('{type_name}')",
-            f"div:has-text('{type_name}')",
-        ]
-        for sel in candidates:
+        target = (
+            page.get_by_role("menuitem", name=type_name, exact=True)
+            .or_(page.get_by_role("button", name=type_name, exact=True))
+            .or_(page.locator(f"li:has-text('{type_name}')"))
+            .locator("visible=true")
+            .first
+        )
+        # Only open the dropdown when the option isn't already visible
+        if target.count() == 0:
+            opener = page.locator("xpath=(//button|//div|//span)[contains(normalize-space(.), 'Limit') or contains(normalize-space(.), 'Market')]").first
             try:
-                opt = page.locator(sel).first
-                if opt and opt.count() > 0 and opt.is_visible():
-                    opt.click(timeout=800)
-                    return True
+                if opener.is_visible():
+                    opener.click(timeout=800)
+                    time.sleep(0.1)
             except Exception:
-                continue
+                pass
+        if target.is_visible():
+            target.click(timeout=800)
+            return True
     except Exception:
         pass
     return False
@@ -930,7 +1362,7 @@ def place_market_order(page: Page, side: str, lots: int, wait_s: float = 5.0) ->
                 # try alternative
                 qty_input = page.locator("input[placeholder*='Quantity'], input[placeholder*='Size']").first
             qty_val = qty_input.input_value() if qty_input and qty_input.count() > 0 else ""
-            if not re.search(r"\d", qty_val or ""):
+            if not _ANY_DIGIT_RE.search(qty_val or ""):
                 return {"ok": False, "error": "qty_not_filled"}
         except Exception:
             pass
@@ -941,7 +1373,7 @@ def place_market_order(page: Page, side: str, lots: int, wait_s: float = 5.0) ->
         try:
             for sel in ["button:has-text('Confirm')", "button:has-text('Yes')", "[data-testid*='confirm']"]:
                 btn = page.locator(sel).first
-                if btn and btn.count() > 0 and btn.is_visible():
+                if btn and btn.is_visible():
                     btn.click(timeout=1000)
                     break
         except Exception:
@@ -952,12 +1384,20 @@ def place_market_order(page: Page, side: str, lots: int, wait_s: float = 5.0) ->
         return {"ok": False, "error": str(e)}
 
 
+def _safe_float(text: Optional[str]) -> Optional[float]:
+    """Parse a float, returning None for empty or malformed input."""
+    try:
+        return float(text) if text else None
+    except (TypeError, ValueError):
+        return None
+
+
 def _parse_lots_from_size(size_text: Optional[str]) -> Optional[int]:
     """Convert a size like '+0.001 BTC' to integer lots assuming 1 lot = 0.001 BTC."""
     if not size_text:
         return None
     try:
-        m = re.search(r"([+-]?[0-9]*\.?[0-9]+)", size_text)
+        m = _SIZE_NUM_RE.search(size_text)
         if not m:
             return None
         btc = abs(float(m.group(1)))
@@ -972,7 +1412,7 @@ def close_position_market(page: Page, wait_s: float = 5.0) -> Dict[str, Any]:
     try:
         pos = extract_position_data(page)
         size_txt = pos.get("size") or ""
-        if not re.search(r"[0-9]", size_txt):
+        if not _ANY_DIGIT_RE.search(size_txt):
             return {"success": True, "action": "close_position_market", "note": "no_position"}
         lots = _parse_lots_from_size(size_txt) or 1
         side = "sell" if "+" in size_txt else ("buy" if "-" in size_txt else "sell")
@@ -988,7 +1428,7 @@ def close_position_market(page: Page, wait_s: float = 5.0) -> Dict[str, Any]:
         time.sleep(wait_s)
         pos2 = extract_position_data(page)
         size2 = pos2.get("size") or ""
-        cleared = not re.search(r"[0-9]", size2)
+        cleared = not _ANY_DIGIT_RE.search(size2)
         return {"success": cleared, "action": "close_position_market", "lots": lots}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -997,8 +1437,7 @@ def close_position_market(page: Page, wait_s: float = 5.0) -> Dict[str, Any]:
 def _fill_order_inputs(page: Page, price: str, lots: str) -> bool:
     """Fill limit price and lot size inputs. Returns True on best-effort success."""
     ok = True
-    if RPA_DIAG:
-        log(f"🔧 _fill_order_inputs: price={price}, lots={lots}")
+    log_debug("_fill_order_inputs: price=%s, lots=%s", price, lots)
     
     # First, try to dismiss any overlays or dropdowns that might be interfering
     try:
@@ -1025,9 +1464,8 @@ def _fill_order_inputs(page: Page, price: str, lots: str) -> bool:
     for selector in price_selectors:
         try:
             price_in = page.locator(selector).first
-            if price_in and price_in.count() > 0 and price_in.is_visible():
-                if RPA_DIAG:
-                    log(f"🔧 Found price input with selector: {selector}")
+            if price_in and price_in.is_visible():
+                log_debug("Found price input with selector: %s", selector)
                 try:
                     # Try force clicking by using force=True to bypass intercepts
                     price_in.click(force=True, timeout=1000)
@@ -1046,32 +1484,26 @@ def _fill_order_inputs(page: Page, price: str, lots: str) -> bool:
                     # Tab to next field
                     page.keyboard.press("Tab")
                     price_filled = True
-                    if RPA_DIAG:
-                        log(f"🔧 Price input filled successfully using force click")
+                    log_debug("Price input filled successfully using force click")
                     break
                 except Exception as e:
-                    if RPA_DIAG:
-                        log(f"🔧 Price selector {selector} failed with force: {e}")
+                    log_debug("Price selector %s failed with force: %s", selector, e)
                     # Try JavaScript approach as fallback
                     try:
                         page.evaluate(f"document.querySelector('{selector}').value = '{price}'")
                         page.evaluate(f"document.querySelector('{selector}').dispatchEvent(new Event('input', {{bubbles: true}}))")
                         price_filled = True
-                        if RPA_DIAG:
-                            log(f"🔧 Price input filled using JavaScript")
+                        log_debug("Price input filled using JavaScript")
                         break
                     except Exception as js_e:
-                        if RPA_DIAG:
-                            log(f"🔧 JavaScript fallback failed: {js_e}")
+                        log_debug("JavaScript fallback failed: %s", js_e)
                         continue
         except Exception as e:
-            if RPA_DIAG:
-                log(f"🔧 Price selector {selector} failed: {e}")
+            log_debug("Price selector %s failed: %s", selector, e)
             continue
     
     if not price_filled:
-        if RPA_DIAG:
-            log("❌ No price input found")
+        diag("❌ No price input found")
         ok = False
 
     # Try multiple quantity input selectors
@@ -1090,9 +1522,8 @@ def _fill_order_inputs(page: Page, price: str, lots: str) -> bool:
     for selector in qty_selectors:
         try:
             qty_in = page.locator(selector).first
-            if qty_in and qty_in.count() > 0 and qty_in.is_visible():
-                if RPA_DIAG:
-                    log(f"🔧 Found quantity input with selector: {selector}")
+            if qty_in and qty_in.is_visible():
+                log_debug("Found quantity input with selector: %s", selector)
                 try:
                     # Try force clicking by using force=True to bypass intercepts
                     qty_in.click(force=True, timeout=1000)
@@ -1111,105 +1542,91 @@ def _fill_order_inputs(page: Page, price: str, lots: str) -> bool:
                     # Tab to next field
                     page.keyboard.press("Tab")
                     qty_filled = True
-                    if RPA_DIAG:
-                        log(f"🔧 Quantity input filled successfully using force click")
+                    log_debug("Quantity input filled successfully using force click")
                     break
                 except Exception as e:
-                    if RPA_DIAG:
-                        log(f"🔧 Quantity selector {selector} failed with force: {e}")
+                    log_debug("Quantity selector %s failed with force: %s", selector, e)
                     # Try JavaScript approach as fallback
                     try:
                         page.evaluate(f"document.querySelector('{selector}').value = '{lots}'")
                         page.evaluate(f"document.querySelector('{selector}').dispatchEvent(new Event('input', {{bubbles: true}}))")
                         qty_filled = True
-                        if RPA_DIAG:
-                            log(f"🔧 Quantity input filled using JavaScript")
+                        log_debug("Quantity input filled using JavaScript")
                         break
                     except Exception as js_e:
-                        if RPA_DIAG:
-                            log(f"🔧 JavaScript fallback failed: {js_e}")
+                        log_debug("JavaScript fallback failed: %s", js_e)
                         continue
         except Exception as e:
-            if RPA_DIAG:
-                log(f"🔧 Quantity selector {selector} failed: {e}")
+            log_debug("Quantity selector %s failed: %s", selector, e)
             continue
     
     if not qty_filled:
-        if RPA_DIAG:
-            log("❌ No quantity input found")
+        diag("❌ No quantity input found")
         ok = False
 
     return ok
 
 
-def _click_submit(page: Page, side: str) -> bool:
-    """Click the Buy or Sell submit button. Returns True if click attempted."""
-    side_l = (side or "").strip().lower()
-    want_buy = side_l in ("buy", "long")
-    label = "Buy" if want_buy else "Sell"
-    
-    if RPA_DIAG:
-        log(f"🔧 _click_submit: looking for {label} button")
-    
-    # Try multiple button selectors in order of preference
-    button_selectors = [
+def _submit_selectors(label: str) -> tuple:
+    low = label.lower()
+    return (
         # Class-based selectors (most specific)
-        f"div.{label.lower()}",
-        f"button.{label.lower()}",
-        f"div.{label.lower()}-button",
-        f"button.{label.lower()}-button",
+        f"div.{low}",
+        f"button.{low}",
+        f"div.{low}-button",
+        f"button.{low}-button",
         # Text-based selectors
         f"button:has-text('{label}')",
         f"div:has-text('{label}')",
         f"[role='button']:has-text('{label}')",
         # Data attribute selectors
-        f"[data-testid*='{label.lower()}']",
-        f"[data-cy*='{label.lower()}']",
+        f"[data-testid*='{low}']",
+        f"[data-cy*='{low}']",
         # Broader selectors
-        f"xpath=(//button|//div)[contains(@class, '{label.lower()}') or contains(normalize-space(.), '{label}')]"
-    ]
+        f"xpath=(//button|//div)[contains(@class, '{low}') or contains(normalize-space(.), '{label}')]",
+    )
+
+
+# Submit button selectors, formatted once per side (keyed by want_buy)
+_SUBMIT_SELECTORS = {True: _submit_selectors("Buy"), False: _submit_selectors("Sell")}
+
+
+def _click_submit(page: Page, side: str) -> bool:
+    """Click the Buy or Sell submit button. Returns True if click attempted."""
+    side_l = (side or "").strip().lower()
+    want_buy = side_l in ("buy", "long")
+    label = "Buy" if want_buy else "Sell"
+    
+    log_debug("_click_submit: looking for %s button", label)
     
-    for selector in button_selectors:
+    # Try button selectors in order of preference
+    for selector in _SUBMIT_SELECTORS[want_buy]:
         try:
-            if "xpath=" in selector:
-                btn = page.locator(selector).first
-            else:
-                btn = page.locator(selector).first
-                
-            if btn and btn.count() > 0 and btn.is_visible():
+            btn = page.locator(selector).first
+            if btn and btn.is_visible():
                 if RPA_DIAG:
-                    log(f"🔧 Found {label} button with selector: {selector}")
+                    diag("🔧 Found %s button with selector: %s", label, selector)
                     try:
                         btn_text = btn.inner_text(timeout=500)
-                        log(f"🔧 Button text: '{btn_text}'")
+                        diag("🔧 Button text: '%s'", btn_text)
                     except Exception:
                         pass
-                try:
-                    btn.scroll_into_view_if_needed(timeout=800)
-                except Exception:
-                    pass
-                btn.click(timeout=2000)
-                if RPA_DIAG:
-                    log(f"🔧 Clicked {label} button successfully")
+                _click(btn, timeout=2000)
+                log_debug("Clicked %s button successfully", label)
                 return True
         except Exception as e:
-            if RPA_DIAG:
-                log(f"🔧 {label} selector {selector} failed: {e}")
+            log_debug("%s selector %s failed: %s", label, selector, e)
             continue
     
     if RPA_DIAG:
-        log(f"❌ No {label} button found with any selector")
+        diag("❌ No %s button found with any selector", label)
+        if not _snapshot_allowed(f"submit_button_not_found_{label}"):
+            return False
         # Take a diagnostic snapshot to see what's available
         try:
             snap_filename = f"submit_button_not_found_{label.lower()}_{int(time.time())}.html"
-            page.content()
-            if os.path.exists("debuuug"):
-                snap_path = os.path.join("debuuug", snap_filename)
-            else:
-                snap_path = snap_filename
-            with open(snap_path, "w", encoding="utf-8") as f:
-                f.write(page.content())
-            log(f"🔍 Saved DOM snapshot: {snap_path}")
+            snap_path = _save_diag_html(snap_filename, page.content())
+            diag("🔍 Saved DOM snapshot: %s", snap_path)
         except Exception:
             pass
     
@@ -1217,59 +1634,66 @@ def _click_submit(page: Page, side: str) -> bool:
 
 
 # Readiness and verification helpers
+# Which order-form marker is rendered: both named inputs, a Buy/Sell side toggle, or both
+# placeholder-matched inputs (cheap CSS checks before the XPath text scan); false when none
+_TRADE_FORM_READY_JS = """
+() => {
+  const q = s => document.querySelector(s);
+  if (q("input[name='orderPrice']") && q("input[name='Quantity']")) return 'orderPrice and Quantity inputs';
+  if (q("input[placeholder*='Price'], input[placeholder*='price']")
+      && q("input[placeholder*='Quantity'], input[placeholder*='quantity'], input[placeholder*='Size'], input[placeholder*='size']"))
+    return 'alternative price/qty inputs';
+  const xp = "(//div|//button|//span)[contains(normalize-space(.), 'Buy | Long') or contains(normalize-space(.), 'Sell | Short')]";
+  if (document.evaluate(xp, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue) return 'side toggle';
+  return false;
+}
+"""
+
+
+# Page id -> URL the order form was last confirmed on; a page still at that URL is not re-probed.
+# Entries are dropped on any main-frame navigation (reloads included) and when CDP disconnects.
+_TRADE_READY_URLS: Dict[int, str] = {}
+_TRADE_READY_HOOKED: set = set()
+
+
 def wait_for_trade_page_ready(page: Page, timeout_s: float = 12.0) -> bool:
     """Wait until the limit order form appears (price & quantity inputs or side toggles)."""
+    url = page.url
+    if _TRADE_READY_URLS.get(id(page)) == url:
+        return True
+    log_debug("wait_for_trade_page_ready: timeout=%ss", timeout_s)
+
+    # All markers are checked together in-page, every 250ms, until one shows up
+    try:
+        found = page.wait_for_function(_TRADE_FORM_READY_JS, timeout=max(1.0, timeout_s) * 1000, polling=250)
+    except Exception:
+        found = None
+    if found is not None:
+        key = id(page)
+        if key not in _TRADE_READY_HOOKED:
+            try:
+                page.on("framenavigated", lambda frame: frame.parent_frame is None and _TRADE_READY_URLS.pop(key, None))
+                _TRADE_READY_HOOKED.add(key)
+            except Exception:
+                pass
+        if key in _TRADE_READY_HOOKED:
+            _TRADE_READY_URLS[key] = url
+        if RPA_DIAG:
+            try:
+                log_debug("Trade page ready: found %s", found.json_value())
+            except Exception:
+                pass
+        return True
+
     if RPA_DIAG:
-        log(f"🔧 wait_for_trade_page_ready: timeout={timeout_s}s")
-    
-    deadline = time.time() + max(1.0, timeout_s)
-    while time.time() < deadline:
-        try:
-            # Check for order price and quantity inputs
-            price_input = page.locator("input[name='orderPrice']").first
-            qty_input = page.locator("input[name='Quantity']").first
-            if price_input.count() > 0 and qty_input.count() > 0:
-                if RPA_DIAG:
-                    log(f"🔧 Trade page ready: found orderPrice and Quantity inputs")
-                return True
-        except Exception:
-            pass
-        
-        try:
-            # Check for side toggles as alternative
-            side_toggle = page.locator("xpath=(//div|//button|//span)[contains(normalize-space(.), 'Buy | Long') or contains(normalize-space(.), 'Sell | Short')]").first
-            if side_toggle.count() > 0:
-                if RPA_DIAG:
-                    log(f"🔧 Trade page ready: found side toggle")
-                return True
-        except Exception:
-            pass
-        
-        # Try alternative input selectors
-        try:
-            alt_price = page.locator("input[placeholder*='Price'], input[placeholder*='price']").first
-            alt_qty = page.locator("input[placeholder*='Quantity'], input[placeholder*='quantity'], input[placeholder*='Size'], input[placeholder*='size']").first
-            if alt_price.count() > 0 and alt_qty.count() > 0:
-                if RPA_DIAG:
-                    log(f"🔧 Trade page ready: found alternative price/qty inputs")
-                return True
-        except Exception:
-            pass
-            
-        time.sleep(0.3)
-    
-    if RPA_DIAG:
-        log(f"❌ Trade page not ready after {timeout_s}s")
+        diag("❌ Trade page not ready after %ss", timeout_s)
+        if not _snapshot_allowed("trade_page_not_ready"):
+            return False
         # Take diagnostic snapshot
         try:
             snap_filename = f"trade_page_not_ready_{int(time.time())}.html"
-            if os.path.exists("debuuug"):
-                snap_path = os.path.join("debuuug", snap_filename)
-            else:
-                snap_path = snap_filename
-            with open(snap_path, "w", encoding="utf-8") as f:
-                f.write(page.content())
-            log(f"🔍 Saved DOM snapshot: {snap_path}")
+            snap_path = _save_diag_html(snap_filename, page.content())
+            diag("🔍 Saved DOM snapshot: %s", snap_path)
         except Exception:
             pass
     
@@ -1279,7 +1703,7 @@ def wait_for_trade_page_ready(page: Page, timeout_s: float = 12.0) -> bool:
 def open_orders_ready(page: Page, timeout_s: float = 8.0) -> bool:
     """Ensure the Open Orders table or empty-state text is visible."""
     try:
-        _activate_tab(page, r"^Open\s*Orders$")
+        _ensure_tab(page, "Open Orders")
     except Exception:
         pass
     deadline = time.time() + max(1.0, timeout_s)
@@ -1293,7 +1717,7 @@ def open_orders_ready(page: Page, timeout_s: float = 8.0) -> bool:
         except Exception:
             pass
         try:
-            if page.get_by_text(re.compile(r"no\s+open\s+orders", re.I)).first.count() > 0:
+            if page.get_by_text(_NO_OPEN_ORDERS_RE).first.count() > 0:
                 return True
         except Exception:
             pass
@@ -1301,6 +1725,128 @@ def open_orders_ready(page: Page, timeout_s: float = 8.0) -> bool:
     return False
 
 
+# Installs (or re-uses) a MutationObserver on the visible Open Orders table and returns a
+# counter bumped on every change. Returns null when no such table is rendered. When called
+# on the cached orders table element it watches exactly that table; otherwise it falls back
+# to a header match that excludes the Positions table (entry/mark price, PnL columns).
+_ORDERS_WATCH_JS = """
+(t) => {
+  const live = x => !!(x && x.isConnected && x.offsetParent);
+  if (!live(t)) t = null;
+  const w = window.__rpaOrdersWatch;
+  if (w && live(w.table) && (!t || t === w.table)) return w.version;
+  const table = t || [...document.querySelectorAll('table')].find(x => {
+    if (!x.offsetParent || !x.tHead) return false;
+    const h = x.tHead.innerText.toLowerCase();
+    return h.includes('price') && /qty|quantity|size/.test(h) && !/entry|mark price|pnl/.test(h);
+  });
+  if (!table) return null;
+  if (w && w.observer) w.observer.disconnect();
+  const st = { table, version: (w ? w.version : 0) + 1 };
+  st.observer = new MutationObserver(() => { st.version++; });
+  st.observer.observe(table, { subtree: true, childList: true, characterData: true });
+  window.__rpaOrdersWatch = st;
+  return st.version;
+}
+"""
+
+
+def _orders_version(page: Page) -> Optional[int]:
+    """Change counter for the Open Orders table (None if it can't be watched)."""
+    table = _ORDERS_TABLE_CACHE.get(id(page))
+    if table is not None:
+        try:
+            return table.evaluate(_ORDERS_WATCH_JS, timeout=500)
+        except Exception:
+            pass
+    try:
+        return page.evaluate(_ORDERS_WATCH_JS)
+    except Exception:
+        return None
+
+
+_ORDERS_CHANGED_JS = "(v) => (" + _ORDERS_WATCH_JS.strip() + ")(null) !== v"
+
+
+def _jittered(delay: float) -> float:
+    """delay plus up to 25% random jitter, so retries don't line up."""
+    return delay + random.uniform(0, delay * 0.25)
+
+
+def _wait_orders_change(page: Page, version: Optional[int], timeout_s: float, fallback_s: float = 0.5) -> None:
+    """Block until the Open Orders table moves past version, or timeout_s elapses.
+
+    Falls back to sleeping fallback_s when the table could not be observed.
+    """
+    if timeout_s <= 0:
+        return
+    if version is None:
+        time.sleep(min(fallback_s, timeout_s))
+        return
+    try:
+        page.wait_for_function(_ORDERS_CHANGED_JS, arg=version, timeout=int(timeout_s * 1000))
+    except Exception:
+        pass
+
+
+# Same idea for the positions table: a counter bumped by a MutationObserver on the table
+# holding the BTCUSD row, so the monitor can sleep until the position actually changes
+_POSITIONS_WATCH_JS = """
+() => {
+  const w = window.__rpaPositionsWatch;
+  if (w && w.table && w.table.isConnected) return w.version;
+  const row = [...document.querySelectorAll('tr')].find(r => /btcusd/i.test(r.innerText || ''));
+  const table = row && row.closest('table');
+  if (!table) return null;
+  const st = { table, version: (w ? w.version : 0) + 1 };
+  new MutationObserver(() => { st.version++; })
+    .observe(table, { subtree: true, childList: true, characterData: true });
+  window.__rpaPositionsWatch = st;
+  return st.version;
+}
+"""
+_POSITIONS_CHANGED_JS = "(v) => (" + _POSITIONS_WATCH_JS.strip() + ")() !== v"
+
+
+def _positions_version(page: Page) -> Optional[int]:
+    """Change counter for the positions table (None if it can't be watched)."""
+    try:
+        return page.evaluate(_POSITIONS_WATCH_JS)
+    except Exception:
+        return None
+
+
+def _wait_positions_change(page: Page, version: int, timeout_s: float) -> bool:
+    """Block until the positions table moves past version; True if it did before timeout_s.
+
+    Polls on a 250ms timer rather than requestAnimationFrame, which doesn't fire in a hidden
+    tab. Only a timeout counts as "no change"; other errors (closed or navigating page) propagate.
+    """
+    try:
+        page.wait_for_function(_POSITIONS_CHANGED_JS, arg=version, timeout=max(1, int(timeout_s * 1000)), polling=250)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+def _orders_rows_sig(table) -> Optional[str]:
+    """Raw tbody row texts of an orders table joined into one string (None if unreadable).
+
+    Equal strings mean the table is unchanged, so callers can skip a full extract_open_orders.
+    """
+    if table is None:
+        return None
+    try:
+        return table.evaluate("t => [...t.querySelectorAll('tbody tr')].map(r => r.innerText || '').join('\\x1f')")
+    except Exception:
+        return None
+
+
+def _fast_orders_sig(orders: List[Dict[str, Any]]) -> tuple:
+    """Order-sensitive (side, price, qty, symbol) tuple; equal tuples imply equal _orders_signature."""
+    return tuple((o.get("side"), o.get("price"), o.get("qty"), o.get("symbol")) for o in orders)
+
+
 def _orders_signature(orders: List[Dict[str, Any]]) -> List[str]:
     """Create a simple signature list for open orders to detect changes."""
     sigs: List[str] = []
@@ -1311,11 +1857,13 @@ def _orders_signature(orders: List[Dict[str, Any]]) -> List[str]:
     return sigs
 
 
-def place_limit_order(page: Page, side: str, price: float, lots: int, maker_only: bool = True, wait_s: float = 10.0) -> Dict[str, Any]:
+def place_limit_order(page: Page, side: str, price: float, lots: int, maker_only: bool = True, wait_s: float = 10.0, verify: bool = True) -> Dict[str, Any]:
     """Place a maker-only limit order via the UI and verify by matching side/price in Open Orders afterwards.
 
+    With verify=False it returns right after submitting (ok means submitted); see place_limit_orders_batch.
     Returns dict: { 'ok': bool, 'after': [...], 'error': optional }
     """
+    _invalidate_state_cache(page)
     try:
         # Ensure trade form is ready
         ready = wait_for_trade_page_ready(page, timeout_s=15)
@@ -1323,8 +1871,7 @@ def place_limit_order(page: Page, side: str, price: float, lots: int, maker_only
             return {"ok": False, "after": [], "error": "trade_form_not_ready"}
         
         # First, ensure we're in "Limit" order mode (not Stop Limit, Trailing Stop, etc.)
-        if RPA_DIAG:
-            log(f"🔧 Ensuring Limit order type is selected")
+        log_debug("Ensuring Limit order type is selected")
         try:
             # Look for order type selector and click "Limit"
             limit_options = [
@@ -1337,10 +1884,9 @@ def place_limit_order(page: Page, side: str, price: float, lots: int, maker_only
             for selector in limit_options:
                 try:
                     limit_btn = page.locator(selector).first
-                    if limit_btn and limit_btn.count() > 0 and limit_btn.is_visible():
+                    if limit_btn and limit_btn.is_visible():
                         limit_btn.click(timeout=1000)
-                        if RPA_DIAG:
-                            log(f"🔧 Selected Limit order type")
+                        log_debug("Selected Limit order type")
                         time.sleep(0.3)
                         break
                 except Exception:
@@ -1359,22 +1905,22 @@ def place_limit_order(page: Page, side: str, price: float, lots: int, maker_only
         
         # Verify the inputs actually contain our values
         if RPA_DIAG:
-            log(f"🔧 Verifying input values...")
+            diag("🔧 Verifying input values...")
             try:
                 price_input = page.locator("input[name='orderPrice']").first
                 if price_input.count() > 0:
                     actual_price = price_input.input_value()
-                    log(f"🔧 Price input value: '{actual_price}' (expected: {price})")
+                    diag("🔧 Price input value: '%s' (expected: %s)", actual_price, price)
             except Exception as e:
-                log(f"🔧 Could not read price input: {e}")
+                diag("🔧 Could not read price input: %s", e)
             
             try:
                 qty_input = page.locator("input[name='Quantity']").first
                 if qty_input.count() > 0:
                     actual_qty = qty_input.input_value()
-                    log(f"🔧 Quantity input value: '{actual_qty}' (expected: {lots})")
+                    diag("🔧 Quantity input value: '%s' (expected: %s)", actual_qty, lots)
             except Exception as e:
-                log(f"🔧 Could not read quantity input: {e}")
+                diag("🔧 Could not read quantity input: %s", e)
                 
         # Submit
         clicked = _click_submit(page, side)
@@ -1382,141 +1928,229 @@ def place_limit_order(page: Page, side: str, price: float, lots: int, maker_only
             return {"ok": False, "after": [], "error": "submit_button_not_found"}
         
         # Check for any confirmation dialogs or error messages
-        if RPA_DIAG:
-            log(f"🔧 Checking for dialogs or error messages after submit...")
+        log_debug("Checking for dialogs or error messages after submit...")
         time.sleep(0.5)
         
         # Look for confirmation dialogs and click "Confirm" if present
         try:
-            confirm_selectors = [
-                "button:has-text('Confirm')",
-                "button:has-text('Yes')",
-                "button:has-text('OK')",
-                "[data-testid*='confirm']",
-                ".confirm-button",
-                ".modal button:has-text('Confirm')"
-            ]
-            for selector in confirm_selectors:
-                try:
-                    confirm_btn = page.locator(selector).first
-                    if confirm_btn and confirm_btn.count() > 0 and confirm_btn.is_visible():
-                        confirm_btn.click(timeout=1000)
-                        if RPA_DIAG:
-                            log(f"🔧 Clicked confirmation dialog")
-                        time.sleep(0.3)
-                        break
-                except Exception:
-                    continue
-        except Exception:
-            pass
-        
-        # Look for error messages
-        try:
-            error_selectors = [
-                ".error-message",
-                ".alert-error",
-                "[role='alert']",
-                ".notification.error",
-                ".toast.error",
-                "*:has-text('Error')",
-                "*:has-text('Invalid')",
-                "*:has-text('Failed')"
-            ]
-            for selector in error_selectors:
-                try:
-                    error_elem = page.locator(selector).first
-                    if error_elem and error_elem.count() > 0 and error_elem.is_visible():
-                        error_text = error_elem.inner_text(timeout=500)
-                        if RPA_DIAG:
-                            log(f"🔧 ⚠️ Found error message: {error_text}")
-                except Exception:
-                    continue
+            confirm_btn = page.locator(_ORDER_CONFIRM_UNION).locator("visible=true").first
+            if confirm_btn.is_visible():
+                confirm_btn.click(timeout=1000)
+                log_debug("Clicked confirmation dialog")
+                time.sleep(0.3)
         except Exception:
             pass
         
-        # Wait longer for order to process
-        time.sleep(1.0)
-        open_orders_ready(page, timeout_s=8)
-        # Poll for an order that matches side and price
-        target_side = ("long" if side.lower() in ("buy", "long") else "short")
-        def _norm_num(s: str) -> str:
-            return re.sub(r"[^0-9\.-]", "", s or "")
-        target_price_norm = _norm_num(str(price))
-        try:
-            target_price_val = float(target_price_norm)
-        except Exception:
-            target_price_val = None
-        
+        # Look for error messages (only reported in diagnostic mode)
         if RPA_DIAG:
-            log(f"🔧 Verification: looking for side='{target_side}' price={price} (norm={target_price_norm})")
-        
-        deadline = time.time() + max(2.0, wait_s)
-        after = []
-        while time.time() < deadline:
             try:
-                info = extract_open_orders(page)
-                after = info.get("orders", [])
-                
-                if RPA_DIAG:
-                    log(f"🔧 Verification: found {len(after)} orders in Open Orders")
-                    for i, o in enumerate(after):
-                        log(f"🔧   [{i}] side='{o.get('side')}' price='{o.get('price')}' qty='{o.get('qty')}'")
-                
-                # match by side text and price - BOTH must match
-                found = False
-                for o in after:
-                    s = (o.get("side") or "").strip().lower()
-                    p = (o.get("price") or "")
-                    p_norm = _norm_num(p)
-                    
-                    # First check if side matches
-                    side_matches = target_side in s
-                    price_matches = False
-                    
-                    if side_matches:
-                        # Check price match - must be exact or within tolerance
-                        if target_price_norm and p_norm:
-                            if target_price_norm in p_norm or p_norm in target_price_norm:
-                                price_matches = True
-                            else:
-                                try:
-                                    pv = float(p_norm)
-                                    if target_price_val is not None and abs(pv - target_price_val) <= 2.0:
-                                        price_matches = True
-                                except Exception:
-                                    pass
-                    
-                    if side_matches and price_matches:
-                        if RPA_DIAG:
-                            log(f"🔧 ✅ Found matching order: side='{s}' price='{p}' (matches target)")
-                        found = True
-                        break
-                    elif side_matches and RPA_DIAG:
-                        log(f"🔧 ❌ Side matches but price doesn't: side='{s}' price='{p}' vs target={price}")
-                
-                if found:
-                    return {"ok": True, "after": after}
-            except Exception as e:
-                if RPA_DIAG:
-                    log(f"🔧 Verification error: {e}")
-            time.sleep(0.5)
-        # If not matched, return what we saw and log if diagnostic mode
-        if RPA_DIAG:
-            try:
-                for i, o in enumerate(after, 1):
-                    log(f"🔎 After[{i}] side={o.get('side')} price={o.get('price')} qty={o.get('qty')} size={o.get('size')}")
+                error_elem = page.locator(_ORDER_ERROR_UNION).locator("visible=true").first
+                if error_elem.is_visible():
+                    error_text = error_elem.inner_text(timeout=500)
+                    diag("🔧 ⚠️ Found error message: %s", error_text)
             except Exception:
                 pass
+        
+        if not verify:
+            return {"ok": True, "after": [], "submitted": True}
+        
+        # Wait longer for order to process
+        time.sleep(1.0)
+        open_orders_ready(page, timeout_s=8)
+        found, after = _verify_orders_visible(page, [(side, price)], wait_s)
+        if found[0]:
+            return {"ok": True, "after": after}
         return {"ok": False, "after": after, "error": "order_not_visible_in_open_orders"}
     except Exception as e:
         return {"ok": False, "after": [], "error": str(e)}
 
 
-def cancel_open_orders(page: Page, side: Optional[str] = None, price_substr: Optional[str] = None, max_to_cancel: Optional[int] = None, wait_s: float = 3.0) -> Dict[str, Any]:
+def _verify_orders_visible(page: Page, targets: List[tuple], wait_s: float) -> tuple:
+    """Poll Open Orders until every (side, price) target shows up or wait_s passes.
+
+    Sides match by long/short text, prices within ±2 USD. Returns ([found per target], last orders seen).
+    """
+    def _norm_num(s: str) -> str:
+        return _PRICE_CLEAN_RE.sub("", s or "")
+
+    # (target side, parsed target price, original price)
+    wanted = []
+    for side, price in targets:
+        target_side = ("long" if side.lower() in ("buy", "long") else "short")
+        target_price_val = _safe_float(_norm_num(str(price)))
+        wanted.append((target_side, target_price_val, price))
+        log_debug("Verification: looking for side='%s' price=%s", target_side, price)
+
+    def _parse_orders(orders: List[Dict[str, Any]]) -> List[tuple]:
+        return [((o.get("side") or "").strip().lower(), _safe_float(_norm_num(o.get("price") or ""))) for o in orders]
+
+    found = [False] * len(wanted)
+    deadline = time.time() + max(2.0, wait_s)
+    after: List[Dict[str, Any]] = []
+    last_rows_sig: Optional[str] = None
+    delay = 0.1
+    while time.time() < deadline:
+        version = _orders_version(page)
+        try:
+            # Skip the full re-read when the raw rows match the last pass
+            rows_sig = _orders_rows_sig(_cached_orders_table(page))
+            if rows_sig is not None and rows_sig == last_rows_sig:
+                _wait_orders_change(page, version, deadline - time.time(), _jittered(delay))
+                delay = min(delay * 1.7, 1.0)
+                continue
+            info = extract_open_orders(page)
+            after = info.get("orders", [])
+            last_rows_sig = rows_sig
+            delay = 0.1
+            
+            if RPA_DIAG:
+                diag("🔧 Verification: found %s orders in Open Orders", len(after))
+                for i, o in enumerate(after):
+                    diag("🔧   [%s] side='%s' price='%s' qty='%s'", i, o.get('side'), o.get('price'), o.get('qty'))
+            
+            # match by side text and price - BOTH must match (numeric tolerance, no substring matching)
+            parsed = _parse_orders(after)
+            for t_i, (target_side, target_price_val, price) in enumerate(wanted):
+                if found[t_i]:
+                    continue
+                found[t_i] = target_price_val is not None and any(
+                    target_side in s and pv is not None and abs(pv - target_price_val) <= 2.0
+                    for s, pv in parsed
+                )
+                if RPA_DIAG:
+                    if found[t_i]:
+                        diag("🔧 ✅ Found matching order: side='%s' price~%s (matches target)", target_side, price)
+                    else:
+                        for s, pv in parsed:
+                            if target_side in s:
+                                diag("🔧 ❌ Side matches but price doesn't: side='%s' price='%s' vs target=%s", s, pv, price)
+
+            if all(found):
+                return found, after
+        except Exception as e:
+            log_debug("Verification error: %s", e)
+        # Re-read only once the table actually changes
+        _wait_orders_change(page, version, deadline - time.time(), _jittered(delay))
+        delay = min(delay * 1.7, 1.0)
+    # If not matched, return what we saw and log if diagnostic mode
+    if RPA_DIAG:
+        try:
+            for i, o in enumerate(after, 1):
+                diag("🔎 After[%s] side=%s price=%s qty=%s size=%s", i, o.get('side'), o.get('price'), o.get('qty'), o.get('size'))
+        except Exception:
+            pass
+    return found, after
+
+
+def place_limit_orders_batch(page: Page, orders: List[Dict[str, Any]], maker_only: bool = True, wait_s: float = 10.0) -> List[Dict[str, Any]]:
+    """Submit several limit orders back-to-back, then verify them all in one Open Orders pass.
+
+    orders: [ { 'side', 'price', 'lots' }, ... ]
+    Returns one place_limit_order-style dict per order, in the same order.
+    """
+    results = [
+        place_limit_order(page, o["side"], o["price"], o["lots"], maker_only=maker_only, verify=False)
+        for o in orders
+    ]
+    submitted = [i for i, r in enumerate(results) if r.get("ok")]
+    if not submitted:
+        return results
+    # Wait for the orders to process, then look for all of them together
+    time.sleep(1.0)
+    open_orders_ready(page, timeout_s=8)
+    found, after = _verify_orders_visible(page, [(orders[i]["side"], orders[i]["price"]) for i in submitted], wait_s)
+    for i, ok in zip(submitted, found):
+        results[i] = {"ok": True, "after": after} if ok else {"ok": False, "after": after, "error": "order_not_visible_in_open_orders"}
+    return results
+
+
+_CANCEL_BTN_SELECTOR = "button[data-testid='HoldingsCancelButton']"
+_CANCEL_BTN_FALLBACK = "xpath=.//button[contains(normalize-space(.), '✕') or contains(normalize-space(.), 'Cancel')]"
+# Scores the first 10 visible tables by header keywords in-page; returns the best index or -1
+_BEST_ORDERS_TABLE_JS = """
+() => {
+  let bi = -1, bs = -1;
+  [...document.querySelectorAll('table')].slice(0, 10).forEach((t, i) => {
+    if (!t.getClientRects().length) return;
+    const h = ((t.tHead && t.tHead.innerText) || '').toLowerCase();
+    let s = 0;
+    if (/qty|quantity|size/.test(h)) s += 2;
+    if (/price|limit/.test(h)) s += 2;
+    if (/type|side/.test(h)) s += 1;
+    if (s > bs) { bs = s; bi = i; }
+  });
+  return bi;
+}
+"""
+# Clicks the HoldingsCancelButton in each given tbody row index; returns the indices clicked
+_CANCEL_ROWS_JS = """
+(t, idxs) => {
+  const rows = [...t.querySelectorAll('tbody tr')];
+  return idxs.filter(i => {
+    const b = rows[i] && rows[i].querySelector("button[data-testid='HoldingsCancelButton']");
+    if (!b) return false;
+    b.click();
+    return true;
+  });
+}
+"""
+
+
+# Trimmed innerText of every tbody row of a table
+_ROW_TEXTS_JS = "t => [...t.querySelectorAll('tbody tr')].map(r => (r.innerText || '').trim())"
+
+
+def _detect_sides(row_txt: str, want: Optional[str] = None) -> tuple:
+    """Return (has_buy, has_sell) for an Open Orders row from its text.
+
+    Side words count directly; a '-' followed by 1 (e.g. "-1" or "-\\n1") or a negative
+    standalone qty line means short, a positive standalone qty line (1-999) means long.
+    With want='buy'/'sell' the scan stops as soon as that side is found, so the other
+    flag may be left incomplete.
+    """
+    s = row_txt.lower()
+    has_buy = "buy" in s or "long" in s
+    if want == "buy" and has_buy:
+        return True, False
+    has_sell = "sell" in s or "short" in s
+    if want == "sell" and has_sell:
+        return has_buy, True
+    if not has_sell:
+        i = s.find("-")
+        n = len(s)
+        while i != -1:
+            j = i + 1
+            while j < n and s[j].isspace():
+                j += 1
+            if j < n and s[j] == "1":
+                has_sell = True
+                break
+            i = s.find("-", j)
+    if want == "sell" and has_sell:
+        return has_buy, True
+    for line in s.splitlines():
+        if (has_buy and has_sell) or (want == "buy" and has_buy) or (want == "sell" and has_sell):
+            break
+        t = line.strip()
+        digits = t[1:] if t[:1] in ("+", "-") else t
+        if not digits or len(digits) > 3 or not digits.isdigit():
+            continue
+        num_val = int(t)
+        if 0 < num_val < 1000:
+            has_buy = True
+        elif num_val < 0:
+            has_sell = True
+    return has_buy, has_sell
+
+
+def cancel_open_orders(page: Page, side: Optional[str] = None, price_substr: Optional[str] = None, max_to_cancel: Optional[int] = None, wait_s: float = 3.0, before: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
     """Cancel open orders optionally filtered by side ('buy'/'sell'/'long'/'short') and/or price substring.
 
+    Pass before= with a fresh extract_open_orders() result to skip re-reading the table for the snapshot.
+
     Returns: { 'ok': bool, 'before': [...], 'after': [...], 'cancelled': int }
     """
+    _invalidate_state_cache(page)
     side_l: Optional[str] = (side or None)
     if side_l:
         side_l = side_l.strip().lower()
@@ -1524,216 +2158,171 @@ def cancel_open_orders(page: Page, side: Optional[str] = None, price_substr: Opt
             side_l = "buy"
         elif side_l in ("short", "sell"):
             side_l = "sell"
-    # Snapshot before
-    before_info = extract_open_orders(page)
-    before = before_info.get("orders", [])
+    # Snapshot before (unless the caller already has one)
+    if before is None:
+        before = extract_open_orders(page).get("orders", [])
     base_sig = _orders_signature(before)
 
     cancelled = 0
     try:
-        # Ensure on Open Orders tab
-        _activate_tab(page, r"^Open\s*Orders$")
-        page.wait_for_timeout(200)
-
-        # Locate the best table again
-        tables = page.locator("table")
-        tcount = min(tables.count(), 10) if tables else 0
-        target_table = None
-        best = -1
-        for i in range(tcount):
-            t = tables.nth(i)
-            if not t.is_visible():
-                continue
+        # Ensure on Open Orders tab; only a real switch needs time to render
+        if _ACTIVE_TAB.get(id(page)) != "Open Orders":
+            _ensure_tab(page, "Open Orders")
+            page.wait_for_timeout(200)
+
+        # Locate the best table again (unless extract_open_orders already resolved it)
+        target_table = _cached_orders_table(page)
+        if target_table is None:
             try:
-                hdr = (t.locator("thead").inner_text(timeout=400) or "").lower()
+                best_idx = page.evaluate(_BEST_ORDERS_TABLE_JS)
             except Exception:
-                hdr = ""
-            score = 0
-            if any(k in hdr for k in ("qty", "quantity", "size")):
-                score += 2
-            if any(k in hdr for k in ("price", "limit")):
-                score += 2
-            if any(k in hdr for k in ("type", "side")):
-                score += 1
-            if score > best:
-                best = score
-                target_table = t
+                best_idx = -1
+            if best_idx is not None and best_idx >= 0:
+                target_table = page.locator("table").nth(best_idx)
         if not target_table:
             return {"ok": False, "before": before, "after": before, "cancelled": 0, "error": "orders_table_not_found"}
+        _remember_orders_table(page, target_table)
 
         rows = target_table.locator("tbody tr")
-        rc = rows.count() if rows else 0
+        # Read every row's text (and whether it has the cancel testid) in one round-trip;
+        # locators are only resolved for rows we act on
+        try:
+            row_data = target_table.evaluate(
+                "t => [...t.querySelectorAll('tbody tr')].map(r => "
+                "[r.innerText || '', !!r.querySelector(\"[data-testid='HoldingsCancelButton']\")])"
+            )
+        except Exception:
+            row_data = []
 
-        for r_i in range(rc):
-            if max_to_cancel is not None and cancelled >= max_to_cancel:
+        matched: List[tuple] = []
+        for r_i, (row_txt, has_testid_btn) in enumerate(row_data):
+            if max_to_cancel is not None and len(matched) >= max_to_cancel:
                 break
-            row = rows.nth(r_i)
-            try:
-                row_txt = (row.inner_text(timeout=600) or "").strip()
-            except Exception:
-                row_txt = ""
+            row_txt = (row_txt or "").strip()
             
-            if RPA_DIAG:
-                log(f"🔧 Cancel: checking row {r_i}: '{row_txt[:100]}...'")
+            log_debug("Cancel: checking row %s: '%s...'", r_i, row_txt[:100])
             
             # Side filter
             if side_l:
-                has_buy = re.search(r"\b(buy|long)\b", row_txt, re.I) is not None
-                has_sell = re.search(r"\b(sell|short)\b", row_txt, re.I) is not None
-                
-                # Also check for negative quantity (indicates short) or positive (indicates long)
-                # Handle both "-1" and "-\n1" patterns and look specifically for the quantity field
-                if "-" in row_txt and "1" in row_txt:
-                    # Look for patterns that suggest negative quantity
-                    if re.search(r"-\s*\n?\s*1", row_txt) or re.search(r"^\s*-\s*1", row_txt, re.M):
-                        has_sell = True  # This looks like a -1 quantity = short position
-                        if RPA_DIAG:
-                            log(f"🔧 Cancel: detected short from negative quantity pattern in row")
-                
-                # Also look for positive standalone numbers that could be quantities (avoid prices/dates)
-                standalone_nums = re.findall(r"(?:^|\n)\s*([+-]?\d{1,3})\s*(?:\n|$)", row_txt, re.M)
-                for num_str in standalone_nums:
-                    try:
-                        num_val = int(num_str.strip())
-                        if num_val > 0 and num_val < 1000:  # Likely a quantity, not a price
-                            has_buy = True
-                            if RPA_DIAG:
-                                log(f"🔧 Cancel: detected long from standalone positive qty: {num_val}")
-                        elif num_val < 0:
-                            has_sell = True
-                            if RPA_DIAG:
-                                log(f"🔧 Cancel: detected short from standalone negative qty: {num_val}")
-                    except ValueError:
-                        continue
-                
-                if RPA_DIAG:
-                    log(f"🔧 Cancel: row {r_i} side detection - has_buy={has_buy}, has_sell={has_sell}, looking_for={side_l}")
+                has_buy, has_sell = _detect_sides(row_txt, want=side_l)
+
+                log_debug("Cancel: row %s side detection - has_buy=%s, has_sell=%s, looking_for=%s", r_i, has_buy, has_sell, side_l)
                 
                 if side_l == "buy" and not has_buy:
-                    if RPA_DIAG:
-                        log(f"🔧 Cancel: row {r_i} skipped - looking for buy/long but not found")
+                    log_debug("Cancel: row %s skipped - looking for buy/long but not found", r_i)
                     continue
                 if side_l == "sell" and not has_sell:
-                    if RPA_DIAG:
-                        log(f"🔧 Cancel: row {r_i} skipped - looking for sell/short but not found")
+                    log_debug("Cancel: row %s skipped - looking for sell/short but not found", r_i)
                     continue
             
             # Price filter
             if price_substr and (price_substr not in row_txt):
-                if RPA_DIAG:
-                    log(f"🔧 Cancel: row {r_i} skipped - price substr '{price_substr}' not found")
+                log_debug("Cancel: row %s skipped - price substr '%s' not found", r_i, price_substr)
                 continue
 
-            if RPA_DIAG:
-                log(f"🔧 Cancel: row {r_i} matches filters, looking for cancel button")
+            log_debug("Cancel: row %s matches filters", r_i)
+            matched.append((r_i, row_txt, has_testid_btn))
 
-            # Find cancel control within the row
-            cancel_btn = None
-            # Use the specific data-testid for cancel buttons
-            cancel_selectors = [
-                "button[data-testid='HoldingsCancelButton']",
-                "[data-testid='HoldingsCancelButton']",
-                "xpath=.//button[@data-testid='HoldingsCancelButton']",
-                "xpath=.//button[contains(normalize-space(.), '✕')]",
-                "xpath=.//div[contains(normalize-space(.), '✕')]",
-                "xpath=.//span[contains(normalize-space(.), '✕')]",
-                "xpath=.//*[contains(normalize-space(.), '✕')]",
-                "xpath=.//button[contains(normalize-space(.), 'Cancel')]",
-                "xpath=.//*[contains(@aria-label,'Cancel') or contains(@title,'Cancel')][self::button or self::div or self::span]",
-                "css=button.cancel, div.cancel, span.cancel",
-            ]
-            
-            for sel in cancel_selectors:
-                try:
-                    cand = row.locator(sel).first
-                    if cand and cand.count() > 0 and cand.is_visible():
-                        cancel_btn = cand
-                        if RPA_DIAG:
-                            log(f"🔧 Cancel: found button with selector: {sel}")
-                        break
-                except Exception as e:
-                    if RPA_DIAG:
-                        log(f"🔧 Cancel: selector {sel} failed: {e}")
-                    continue
-                    
-            if not cancel_btn:
-                # As a last resort, try last clickable in the row
+        # Click every matched HoldingsCancelButton in one in-page call (same pass, so indices are stable)
+        js_clicked: List[int] = []
+        js_idx = [r_i for r_i, _, has_testid_btn in matched if has_testid_btn]
+        if js_idx:
+            try:
+                js_clicked = target_table.evaluate(_CANCEL_ROWS_JS, js_idx) or []
+            except Exception as e:
+                log_debug("Cancel: in-page click failed: %s", e)
+            cancelled += len(js_clicked)
+            log_debug("Cancel: clicked cancel in rows %s", js_clicked)
+
+        # Remaining matches (no testid, or the in-page click missed) go through a locator
+        for r_i, row_txt, has_testid_btn in matched:
+            if r_i in js_clicked:
+                continue
+            if cancelled:
+                # Earlier cancels may have removed or shifted rows: re-locate this one by its
+                # text and skip it when it is gone, so a row we haven't checked is never clicked
                 try:
-                    candidates = row.locator("xpath=.//button|.//a|.//div[@role='button']")
-                    if candidates.count() > 0:
-                        cancel_btn = candidates.nth(candidates.count() - 1)
-                        if RPA_DIAG:
-                            log(f"🔧 Cancel: using last clickable element as fallback")
+                    live_txts = target_table.evaluate(_ROW_TEXTS_JS) or []
                 except Exception:
-                    pass
-                    
+                    live_txts = []
+                if row_txt not in live_txts:
+                    log_debug("Cancel: row %s no longer present, skipping", r_i)
+                    continue
+                row = rows.nth(live_txts.index(row_txt))
+            else:
+                row = rows.nth(r_i)
+
+            # Find cancel control within the row: the HoldingsCancelButton testid, or a
+            # single ✕/Cancel button lookup when the row has no such testid
+            cancel_btn = None
+            sel = _CANCEL_BTN_SELECTOR if has_testid_btn else _CANCEL_BTN_FALLBACK
+            try:
+                cand = row.locator(sel).first
+                if cand.is_visible():
+                    cancel_btn = cand
+                    log_debug("Cancel: found button with selector: %s", sel)
+            except Exception as e:
+                log_debug("Cancel: selector %s failed: %s", sel, e)
+
             if cancel_btn:
-                if RPA_DIAG:
-                    log(f"🔧 Cancel: attempting to click cancel button for row {r_i}")
-                try:
-                    cancel_btn.scroll_into_view_if_needed(timeout=800)
-                except Exception:
-                    pass
+                log_debug("Cancel: attempting to click cancel button for row %s", r_i)
                 try:
-                    cancel_btn.click(timeout=1500)
+                    _click(cancel_btn, timeout=1500)
                     cancelled += 1
-                    if RPA_DIAG:
-                        log(f"🔧 Cancel: successfully cancelled order {r_i}")
+                    log_debug("Cancel: successfully cancelled order %s", r_i)
                     time.sleep(0.2)
                 except Exception as e:
-                    if RPA_DIAG:
-                        log(f"🔧 Cancel: click failed for row {r_i}: {e}")
+                    log_debug("Cancel: click failed for row %s: %s", r_i, e)
                     continue
             else:
                 if RPA_DIAG:
-                    log(f"🔧 Cancel: no cancel button found for row {r_i}")
+                    diag("🔧 Cancel: no cancel button found for row %s", r_i)
                     # Save a diagnostic snapshot of this row
                     try:
                         row_html = row.inner_html(timeout=500)
                         snap_filename = f"cancel_no_button_row_{r_i}_{int(time.time())}.html"
-                        if os.path.exists("debuuug"):
-                            snap_path = os.path.join("debuuug", snap_filename)
-                        else:
-                            snap_path = snap_filename
-                        with open(snap_path, "w", encoding="utf-8") as f:
-                            f.write(f"<!-- Row {r_i} text: {row_txt} -->\n{row_html}")
-                        log(f"🔍 Saved row HTML: {snap_path}")
+                        snap_path = _save_diag_html(snap_filename, f"<!-- Row {r_i} text: {row_txt} -->\n{row_html}")
+                        diag("🔍 Saved row HTML: %s", snap_path)
                     except Exception:
                         pass
 
         # Verify change
-        if RPA_DIAG:
-            log(f"🔧 Cancel: verifying changes (cancelled={cancelled}, wait_s={wait_s})")
+        log_debug("Cancel: verifying changes (cancelled=%s, wait_s=%s)", cancelled, wait_s)
         deadline = time.time() + max(1.0, wait_s)
         after = before
+        base_rows_sig = "\x1f".join(t or "" for t, _ in row_data)
+        delay = 0.1
         verification_attempts = 0
         while time.time() < deadline:
             verification_attempts += 1
+            version = _orders_version(page)
             try:
-                if RPA_DIAG:
-                    log(f"🔧 Cancel: verification attempt {verification_attempts}")
+                log_debug("Cancel: verification attempt %s", verification_attempts)
+                # Fast path: raw rows identical to what we saw before clicking
+                if row_data and _orders_rows_sig(target_table) == base_rows_sig:
+                    log_debug("Cancel: order rows unchanged")
+                    _wait_orders_change(page, version, deadline - time.time(), _jittered(delay))
+                    delay = min(delay * 1.7, 1.0)
+                    continue
                 info2 = extract_open_orders(page)
                 after = info2.get("orders", [])
                 new_sig = _orders_signature(after)
                 if new_sig != base_sig:
-                    if RPA_DIAG:
-                        log(f"🔧 Cancel: orders changed! before={len(before)} after={len(after)}")
+                    log_debug("Cancel: orders changed! before=%s after=%s", len(before), len(after))
                     break
-                elif RPA_DIAG:
-                    log(f"🔧 Cancel: orders unchanged (still {len(after)} orders)")
+                log_debug("Cancel: orders unchanged (still %s orders)", len(after))
             except Exception as e:
-                if RPA_DIAG:
-                    log(f"🔧 Cancel: verification error: {e}")
+                log_debug("Cancel: verification error: %s", e)
                 # Don't break, just continue trying
-            time.sleep(0.5)
+            _wait_orders_change(page, version, deadline - time.time(), _jittered(delay))
+            delay = min(delay * 1.7, 1.0)
         
-        if RPA_DIAG:
-            log(f"🔧 Cancel: verification completed after {verification_attempts} attempts")
+        log_debug("Cancel: verification completed after %s attempts", verification_attempts)
         
         ok = _orders_signature(after) != base_sig or cancelled > 0
         # Return to Positions
         try:
-            _activate_tab(page, r"^Positions$")
+            _ensure_tab(page, "Positions")
         except Exception:
             pass
         return {"ok": ok, "before": before, "after": after, "cancelled": cancelled}
@@ -1781,8 +2370,7 @@ def analyze_strategy_state(page: Page) -> Dict[str, Any]:
         orders_info = extract_open_orders(page)
         result['orders'] = orders_info.get('orders', [])
         
-        if RPA_DIAG:
-            log(f"🔍 State Analysis: position={pos_info}, orders={len(result['orders'])}")
+        diag("🔍 State Analysis: position=%s, orders=%s", pos_info, len(result['orders']))
         
         # Determine strategy state based on position and orders
         has_position = pos_info and pos_info.get('size') and '0.001' in pos_info.get('size', '')
@@ -1834,94 +2422,23 @@ def analyze_strategy_state(page: Page) -> Dict[str, Any]:
         return result
 
 
-def _infer_position_direction_from_position(pos_info: Dict) -> str:
-    """Infer position direction (long/short) from position data."""
-    if not pos_info:
-        return "unknown"
-    
-    position_size = pos_info.get('size', '')
-    position_side = pos_info.get('side', 'NONE')
-    
-    if "+" in position_size or position_side.lower() in ("long", "buy"):
+@functools.lru_cache(maxsize=128)
+def _direction_from_fields(position_size: str, position_side: str) -> str:
+    size = position_size.lstrip()
+    side = position_side.lower()
+    if size.startswith("+") or side in ("long", "buy"):
         return "long"
-    elif "-" in position_size or position_side.lower() in ("short", "sell"):
+    elif size.startswith("-") or side in ("short", "sell"):
         return "short"
     else:
         return "unknown"
 
 
-def calculate_strategy_prices(position_info: Dict, position_lots: int = 1) -> Dict[str, float]:
-    """Calculate AVG and TP prices based on current position.
-    
-    Args:
-        position_info: Position data from extract_position_data
-        position_lots: Current position size in lots (1, 3, 9, etc.)
-    
-    Returns: {
-        'avg_price': float,
-        'tp_price': float,
-        'avg_lots': int,
-        'tp_lots': int
-    }
-    """
-    # Extract average price
-    avg_price_str = position_info.get('avg_price', '') or ''
-    
-    # Try to parse avg price or estimate from position data
-    try:
-        avg_price = float(re.sub(r"[^0-9\.-]", "", avg_price_str))
-    except (ValueError, TypeError):
-        # Estimate from position data if avg_price not available
-        all_pos_text = str(position_info)
-        price_matches = re.findall(r"\b(\d+\.?\d*)\b", all_pos_text)
-        potential_prices = [float(m) for m in price_matches if 10000 <= float(m) <= 200000]
-        avg_price = potential_prices[0] if potential_prices else 117000
-    
-    # Determine position direction
-    is_long = _infer_position_direction_from_position(position_info) == "long"
-    
-    # Calculate distances based on position size (strategy progression)
-    if position_lots == 1:
-        # Seed phase: 1 lot
-        tp_distance = 300
-        avg_distance = 750
-        avg_lots = 2
-        tp_lots = 2
-    elif position_lots == 3:
-        # First averaging: 3 lots
-        tp_distance = 200
-        avg_distance = 500  # From first avg price, not current avg
-        avg_lots = 6
-        tp_lots = 4
-    elif position_lots >= 9:
-        # Final averaging: 9+ lots
-        tp_distance = 100
-        avg_distance = 300
-        avg_lots = position_lots * 2
-        tp_lots = position_lots + 1
-    else:
-        # Default case
-        tp_distance = 300
-        avg_distance = 750
-        avg_lots = 2
-        tp_lots = 2
-    
-    # Calculate actual prices
-    if is_long:
-        avg_price_target = avg_price - avg_distance  # Long: average down
-        tp_price_target = avg_price + tp_distance    # Long: take profit up
-    else:
-        avg_price_target = avg_price + avg_distance  # Short: average up
-        tp_price_target = avg_price - tp_distance    # Short: take profit down
-    
-    return {
-        'avg_price': avg_price_target,
-        'tp_price': tp_price_target,
-        'avg_lots': avg_lots,
-        'tp_lots': tp_lots,
-        'current_avg': avg_price,
-        'position_direction': 'long' if is_long else 'short'
-    }
+def _infer_position_direction_from_position(pos_info: Dict) -> str:
+    """Infer position direction (long/short) from position data."""
+    if not pos_info:
+        return "unknown"
+    return _direction_from_fields(pos_info.get('size') or '', pos_info.get('side') or 'NONE')
 
 
 def detect_order_fill(before_orders: List[Dict], after_orders: List[Dict]) -> Dict[str, Any]:
@@ -1931,6 +2448,7 @@ def detect_order_fill(before_orders: List[Dict], after_orders: List[Dict]) -> Di
         'filled': bool,
         'fill_type': 'avg'|'tp'|'unknown',
         'filled_order': {...},
+        'filled_orders': [...],  # every order that disappeared (filled_order is set only when exactly one did)
         'remaining_orders': [...]
     }
     """
@@ -1938,37 +2456,35 @@ def detect_order_fill(before_orders: List[Dict], after_orders: List[Dict]) -> Di
         'filled': False,
         'fill_type': 'unknown',
         'filled_order': None,
+        'filled_orders': [],
         'remaining_orders': after_orders
     }
     
     if len(before_orders) <= len(after_orders):
         return result  # No fill detected
     
-    # Find which order is missing
-    before_sigs = {f"{o.get('side')}_{o.get('price')}_{o.get('qty')}" for o in before_orders}
+    # Find which orders are missing (keyed once, no re-scan of before_orders)
+    before_map = {f"{o.get('side')}_{o.get('price')}_{o.get('qty')}": o for o in before_orders}
     after_sigs = {f"{o.get('side')}_{o.get('price')}_{o.get('qty')}" for o in after_orders}
     
-    missing_sigs = before_sigs - after_sigs
+    missing_sigs = before_map.keys() - after_sigs
+    result['filled_orders'] = [before_map[s] for s in missing_sigs]
     
     if len(missing_sigs) == 1:
-        # Find the filled order
-        missing_sig = list(missing_sigs)[0]
-        for order in before_orders:
-            order_sig = f"{order.get('side')}_{order.get('price')}_{order.get('qty')}"
-            if order_sig == missing_sig:
-                result['filled'] = True
-                result['filled_order'] = order
-                
-                # Determine fill type based on order characteristics
-                order_side = order.get('side', '').lower()
-                
-                # This is a simplified heuristic - in practice you'd need more context
-                # AVG orders are typically larger quantities, TP orders are profit-taking
-                if 'long' in order_side or 'short' in order_side:
-                    # Could be either - need position context to determine
-                    result['fill_type'] = 'detected'  # Will be refined by caller
-                
-                break
+        order = before_map[missing_sigs.pop()]
+        result['filled'] = True
+        result['filled_order'] = order
+        
+        # Determine fill type based on order characteristics
+        order_side = (order.get('side') or '').lower()
+        
+        # This is a simplified heuristic - in practice you'd need more context
+        # AVG orders are typically larger quantities, TP orders are profit-taking
+        if 'long' in order_side or 'short' in order_side:
+            # Could be either - need position context to determine
+            result['fill_type'] = 'detected'  # Will be refined by caller
+    elif len(missing_sigs) > 1:
+        log(f"⚠️ {len(missing_sigs)} orders disappeared at once; not treating as a single fill")
     
     return result
 
@@ -2001,9 +2517,7 @@ def handle_order_fill(page: Page, fill_info: Dict, current_position: Dict) -> Di
         is_avg_fill = position_direction in order_side
         is_tp_fill = not is_avg_fill
         
-        if RPA_DIAG:
-            fill_type = 'AVG' if is_avg_fill else 'TP'
-            log(f"🔄 Handling {fill_type} fill: {order_side} {order_qty} @ {order_price}")
+        diag("🔄 Handling %s fill: %s %s @ %s", 'AVG' if is_avg_fill else 'TP', order_side, order_qty, order_price)
         
         if is_avg_fill:
             # AVG order filled - position grew
@@ -2012,7 +2526,7 @@ def handle_order_fill(page: Page, fill_info: Dict, current_position: Dict) -> Di
             # Cancel remaining TP order (price no longer valid)
             remaining_orders = fill_info.get('remaining_orders', [])
             if remaining_orders:
-                cancel_result = cancel_open_orders(page, max_to_cancel=len(remaining_orders))
+                cancel_result = cancel_open_orders(page, max_to_cancel=len(remaining_orders), before=remaining_orders)
                 result['actions_taken'].append(f"Cancelled {cancel_result.get('cancelled', 0)} remaining orders")
             
             # Calculate new position size (estimate)
@@ -2020,7 +2534,12 @@ def handle_order_fill(page: Page, fill_info: Dict, current_position: Dict) -> Di
             estimated_new_lots = 3  # 1 original + 2 from AVG
             
             # Place new TP and AVG orders for grown position
-            strategy_prices = calculate_strategy_prices(current_position, estimated_new_lots)
+            position_info = _strategy_position_info(current_position)
+            position_info["position_lots"] = estimated_new_lots
+            if not position_info["position_avg_price"]:
+                result['errors'].append("Position entry price unavailable")
+                return result
+            strategy_prices = calculate_strategy_prices(position_info)
             
             # Place new TP order
             tp_result = place_limit_order(page, 
@@ -2045,18 +2564,37 @@ def handle_order_fill(page: Page, fill_info: Dict, current_position: Dict) -> Di
             # Cancel remaining AVG order (no longer relevant)
             remaining_orders = fill_info.get('remaining_orders', [])
             if remaining_orders:
-                cancel_result = cancel_open_orders(page, max_to_cancel=len(remaining_orders))
+                cancel_result = cancel_open_orders(page, max_to_cancel=len(remaining_orders), before=remaining_orders)
                 result['actions_taken'].append(f"Cancelled {cancel_result.get('cancelled', 0)} remaining orders")
             
-            # Position should now be flipped - implement new seed strategy
-            # Wait a moment for position to update, then re-implement strategy
-            time.sleep(1.0)
-            
-            strategy_result = implement_haider_strategy(page)
-            if strategy_result.get('success'):
-                result['actions_taken'].append("Re-implemented strategy for flipped position")
+            # Position is now flipped: 1 lot in the TP order's direction at its fill price.
+            # Place the new seed pair from that directly instead of re-reading the page.
+            new_direction = "long" if ("buy" in order_side or "long" in order_side) else "short"
+            fill_price = _safe_float(_PRICE_CLEAN_RE.sub("", order_price or ""))
+            if fill_price is not None:
+                seed = calculate_strategy_prices({
+                    "position_lots": 1,
+                    "position_side": new_direction,
+                    "position_avg_price": fill_price,
+                })
+                for kind in ("tp", "avg"):
+                    kind_lots = int(seed[f"{kind}_lots"])
+                    if kind_lots <= 0:
+                        continue
+                    res = place_limit_order(page, seed[f"{kind}_side"], seed[f"{kind}_price"], kind_lots)
+                    if res.get('ok'):
+                        result['actions_taken'].append(f"Placed seed {kind.upper()}: {kind_lots} @ {seed[f'{kind}_price']}")
+                    else:
+                        result['errors'].append(f"Seed {kind.upper()} failed: {res.get('error', 'unknown')}")
             else:
-                result['errors'].extend(strategy_result.get('errors', []))
+                # Fill price unreadable - wait for the position to update, then re-implement strategy
+                time.sleep(1.0)
+                
+                strategy_result = implement_haider_strategy(page)
+                if strategy_result.get('success'):
+                    result['actions_taken'].append("Re-implemented strategy for flipped position")
+                else:
+                    result['errors'].extend(strategy_result.get('errors', []))
         
         result['success'] = len(result['errors']) == 0
         return result
@@ -2079,8 +2617,7 @@ def adaptive_strategy_engine(page: Page) -> Dict[str, Any]:
     }
     
     try:
-        if RPA_DIAG:
-            log("🎯 Starting Adaptive Strategy Engine")
+        diag("🎯 Starting Adaptive Strategy Engine")
         
         # 1. Analyze current state
         state = analyze_strategy_state(page)
@@ -2093,8 +2630,7 @@ def adaptive_strategy_engine(page: Page) -> Dict[str, Any]:
         current_state = state.get('state')
         next_action = state.get('next_action')
         
-        if RPA_DIAG:
-            log(f"🎯 Current state: {current_state}, Next action: {next_action}")
+        diag("🎯 Current state: %s, Next action: %s", current_state, next_action)
         
         # 2. Take appropriate action based on state
         if next_action == 'create_initial_position':
@@ -2113,7 +2649,11 @@ def adaptive_strategy_engine(page: Page) -> Dict[str, Any]:
             missing_orders = state.get('missing_orders', [])
             position = state.get('position')
             
-            strategy_prices = calculate_strategy_prices(position)
+            position_info = _strategy_position_info(position or {})
+            if position_info["position_side"] not in ("long", "short") or not position_info["position_avg_price"]:
+                result['errors'].append("Position side or entry price unavailable")
+                return result
+            strategy_prices = calculate_strategy_prices(position_info)
             position_direction = strategy_prices['position_direction']
             
             for missing_type in missing_orders:
@@ -2155,8 +2695,7 @@ def strategy_monitor_loop(page: Page, reattach_cb: Optional[Callable] = None) ->
     
     Monitors for order fills and responds according to Haider Strategy rules.
     """
-    if RPA_DIAG:
-        log("🔄 Starting Strategy Monitor Loop")
+    diag("🔄 Starting Strategy Monitor Loop")
     
     # Initial setup
     setup_result = adaptive_strategy_engine(page)
@@ -2168,7 +2707,9 @@ def strategy_monitor_loop(page: Page, reattach_cb: Optional[Callable] = None) ->
     
     # Monitoring loop
     last_orders = []
+    orders_sig: Optional[str] = None
     iteration = 0
+    error_delay = 1.0
     
     while True:
         try:
@@ -2177,8 +2718,9 @@ def strategy_monitor_loop(page: Page, reattach_cb: Optional[Callable] = None) ->
                 log(f"🔄 Monitor iteration {iteration}")
             
             # Get current orders
-            current_orders_info = extract_open_orders(page)
+            current_orders_info = extract_open_orders(page, sig_hint=orders_sig)
             current_orders = current_orders_info.get('orders', [])
+            orders_sig = current_orders_info.get('sig')
             
             # Check for order fills
             if last_orders and len(current_orders) < len(last_orders):
@@ -2200,9 +2742,10 @@ def strategy_monitor_loop(page: Page, reattach_cb: Optional[Callable] = None) ->
             
             # Store current orders for next iteration
             last_orders = current_orders
+            error_delay = 1.0
             
-            # Sleep before next check
-            time.sleep(10)  # Check every 10 seconds
+            # Wait up to 10 seconds, waking early if the orders table changes
+            _wait_orders_change(page, _orders_version(page), 10, fallback_s=10)
             
         except KeyboardInterrupt:
             log("🛑 Strategy monitoring stopped by user")
@@ -2212,191 +2755,20 @@ def strategy_monitor_loop(page: Page, reattach_cb: Optional[Callable] = None) ->
             if reattach_cb:
                 try:
                     page = reattach_cb()
-                    if RPA_DIAG:
-                        log("🔄 Reattached to page")
+                    diag("🔄 Reattached to page")
                 except Exception:
                     log("❌ Reattach failed")
                     break
-            time.sleep(5)  # Wait before retry
-    """Implement the Haider Strategy based on current position state.
-    
-    Expected starting state: 1 open position of 1 lot
-    Action: Place 2 orders:
-    1. AVG order: 2 lots in SAME direction, 750 USD away
-    2. TP order: 2 lots in OPPOSITE direction, 300 USD away
-    
-    Returns: Dict with strategy execution results
-    """
-    strategy_result = {
-        "success": False,
-        "position": None,
-        "orders_placed": [],
-        "errors": []
-    }
-    
-    try:
-        if RPA_DIAG:
-            log("🎯 Starting Haider Strategy Implementation")
-        
-        # 1. Get current position
-        pos_info = extract_position_data(page)
-        if not pos_info:
-            strategy_result["errors"].append("No position found")
-            return strategy_result
-        
-        strategy_result["position"] = pos_info
-        
-        # Extract position details
-        position_side = pos_info.get("side", "NONE")
-        position_size = pos_info.get("size", "")
-        avg_price_str = pos_info.get("avg_price", "")
-        
-        if RPA_DIAG:
-            log(f"🎯 Current Position: side={position_side}, size={position_size}, avg_price={avg_price_str}")
-        
-        # Parse average price
-        try:
-            avg_price = float(re.sub(r"[^0-9\.-]", "", avg_price_str or ""))
-        except ValueError:
-            # If avg_price is N/A, try to infer from position data or use current market price
-            if RPA_DIAG:
-                log(f"🎯 avg_price not available ({avg_price_str}), will use position data to estimate")
-            
-            # Look for a numeric value in the position data that could be the avg price
-            # From the raw position data, try to find a price-like number
-            all_pos_text = str(pos_info)
-            price_matches = re.findall(r"\b(\d+\.?\d*)\b", all_pos_text)
-            potential_prices = []
-            for match in price_matches:
-                try:
-                    val = float(match)
-                    # BTC prices are typically between 10,000 and 200,000 USD
-                    if 10000 <= val <= 200000:
-                        potential_prices.append(val)
-                except ValueError:
-                    continue
-            
-            if potential_prices:
-                avg_price = potential_prices[0]  # Use the first reasonable price found
-                if RPA_DIAG:
-                    log(f"🎯 Using estimated avg_price: {avg_price}")
-            else:
-                # Fallback: use a reasonable current price estimate (around 117k based on snapshot)
-                avg_price = 117000
-                if RPA_DIAG:
-                    log(f"🎯 Using fallback avg_price: {avg_price}")
-        
-        if avg_price <= 0:
-            strategy_result["errors"].append(f"Invalid avg_price: {avg_price}")
-            return strategy_result
-        
-        # Determine position direction
-        if position_side == "NONE" and not position_size:
-            strategy_result["errors"].append("No open position found")
-            return strategy_result
-        
-        # Infer direction from size (handle both "+0.001 BTC" and text-based sides)
-        is_long_position = False
-        if "+" in position_size or position_side.lower() in ("long", "buy"):
-            is_long_position = True
-        elif "-" in position_size or position_side.lower() in ("short", "sell"):
-            is_long_position = False
-        else:
-            # If we have a position size but unclear direction, try to infer from other data
-            if position_size and "0.001" in position_size:  # We have a position
-                # Default to long if we can't determine (most positions are long in demo)
-                is_long_position = True
-                if RPA_DIAG:
-                    log(f"🎯 Could not determine direction clearly, defaulting to LONG based on size: {position_size}")
-            else:
-                strategy_result["errors"].append(f"Could not determine position direction from side={position_side}, size={position_size}")
-                return strategy_result
-        
-        direction = "LONG" if is_long_position else "SHORT"
-        if RPA_DIAG:
-            log(f"🎯 Position Direction: {direction} at avg_price={avg_price}")
-        
-        # 2. Calculate order prices
-        # AVG order: same direction, 750 USD away
-        if is_long_position:
-            avg_price_target = avg_price - 750  # Long position: average down
-            tp_price_target = avg_price + 300   # Long position: take profit up
-            avg_side = "long"
-            tp_side = "short"
-        else:
-            avg_price_target = avg_price + 750  # Short position: average up  
-            tp_price_target = avg_price - 300   # Short position: take profit down
-            avg_side = "short"
-            tp_side = "long"
-        
-        if RPA_DIAG:
-            log(f"🎯 AVG Order: {avg_side} 2 lots @ {avg_price_target}")
-            log(f"🎯 TP Order: {tp_side} 2 lots @ {tp_price_target}")
-        
-        # 3. Place AVG order (same direction, 2 lots)
-        if RPA_DIAG:
-            log(f"🎯 Placing AVG order: {avg_side} 2 lots @ {avg_price_target}")
-        
-        avg_result = place_limit_order(page, avg_side, avg_price_target, 2, maker_only=True)
-        if avg_result.get("ok"):
-            strategy_result["orders_placed"].append({
-                "type": "AVG",
-                "side": avg_side,
-                "price": avg_price_target,
-                "lots": 2,
-                "result": "success"
-            })
-            if RPA_DIAG:
-                log(f"✅ AVG order placed successfully")
-        else:
-            error_msg = f"AVG order failed: {avg_result.get('error', 'unknown')}"
-            strategy_result["errors"].append(error_msg)
-            if RPA_DIAG:
-                log(f"❌ {error_msg}")
-        
-        # 4. Place TP order (opposite direction, 2 lots)
-        if RPA_DIAG:
-            log(f"🎯 Placing TP order: {tp_side} 2 lots @ {tp_price_target}")
-        
-        tp_result = place_limit_order(page, tp_side, tp_price_target, 2, maker_only=True)
-        if tp_result.get("ok"):
-            strategy_result["orders_placed"].append({
-                "type": "TP",
-                "side": tp_side,
-                "price": tp_price_target,
-                "lots": 2,
-                "result": "success"
-            })
-            if RPA_DIAG:
-                log(f"✅ TP order placed successfully")
-        else:
-            error_msg = f"TP order failed: {tp_result.get('error', 'unknown')}"
-            strategy_result["errors"].append(error_msg)
-            if RPA_DIAG:
-                log(f"❌ {error_msg}")
-        
-        # 5. Check overall success
-        if len(strategy_result["orders_placed"]) == 2:
-            strategy_result["success"] = True
-            if RPA_DIAG:
-                log(f"🎯 ✅ Haider Strategy implemented successfully! Placed {len(strategy_result['orders_placed'])} orders")
-        else:
-            if RPA_DIAG:
-                log(f"🎯 ❌ Haider Strategy partially failed. Placed {len(strategy_result['orders_placed'])}/2 orders")
-        
-        return strategy_result
-        
-    except Exception as e:
-        strategy_result["errors"].append(f"Strategy implementation error: {str(e)}")
-        if RPA_DIAG:
-            log(f"🎯 ❌ Strategy error: {e}")
-        return strategy_result
+            # Back off (with jitter) on repeated errors, capped at 30s
+            time.sleep(_jittered(error_delay))
+            error_delay = min(error_delay * 2, 30.0)
 
 
 def analyze_current_state(page: Page) -> Dict[str, Any]:
     """Analyze current position and orders to determine strategy state and next action."""
-    position_data = extract_position_data(page)
-    orders_data = extract_open_orders(page)
+    state = extract_position_and_orders(page)
+    position_data = state["position"]
+    orders_data = state["orders"]
     
     # Parse position 
     position_lots = 0
@@ -2405,9 +2777,10 @@ def analyze_current_state(page: Page) -> Dict[str, Any]:
     
     if position_data.get("success") and position_data.get("position"):
         pos = position_data["position"]
-        position_lots = abs(float(pos.get("size", "0")))
-        position_side = "long" if float(pos.get("size", "0")) > 0 else "short"
-        position_avg_price = float(pos.get("avg_price", "0"))
+        raw_size = float(pos.get("size", "0") or "0")
+        position_lots = abs(raw_size)
+        position_side = "long" if raw_size > 0 else "short" if raw_size < 0 else "none"
+        position_avg_price = float(pos.get("avg_price", "0") or "0")
     
     # Parse orders
     open_orders = orders_data.get("orders", [])
@@ -2440,112 +2813,95 @@ def analyze_current_state(page: Page) -> Dict[str, Any]:
     }
 
 
+# Haider stage parameters by position lots: (tp_offset, avg_offset, tp_lots, avg_lots)
+_STRATEGY_PARAMS = {
+    1: (300, 750, 2.0, 2.0),   # Seed stage: TP at ±300, AVG at ±750
+    3: (200, 500, 4.0, 6.0),   # First averaging stage: TP at ±200, AVG at ±500
+    9: (100, 0, 10.0, 0.0),    # Second averaging stage: TP only at ±100, no more averaging
+}
+_STRATEGY_PARAMS_DEFAULT = _STRATEGY_PARAMS[1]
+
+
 def calculate_strategy_prices(position_info: Dict[str, Any]) -> Dict[str, float]:
     """Calculate TP and AVG prices based on current position."""
     lots = position_info.get("position_lots", 0)
     side = position_info.get("position_side", "")
     avg_price = position_info.get("position_avg_price", 0.0)
     
-    if lots == 1:
-        # Seed stage: TP at ±300, AVG at ±750
-        tp_offset = 300
-        avg_offset = 750
-        tp_lots = 2.0
-        avg_lots = 2.0
-    elif lots == 3:
-        # First averaging stage: TP at ±200, AVG at ±500
-        tp_offset = 200
-        avg_offset = 500  
-        tp_lots = 4.0
-        avg_lots = 6.0
-    elif lots == 9:
-        # Second averaging stage: TP only at ±100
-        tp_offset = 100
-        avg_offset = 0  # No more averaging
-        tp_lots = 10.0
-        avg_lots = 0.0
-    else:
-        # Default fallback
-        tp_offset = 300
-        avg_offset = 750
-        tp_lots = 2.0
-        avg_lots = 2.0
-    
-    if side == "long":
-        tp_price = avg_price + tp_offset  # Short TP above
-        avg_price_target = avg_price - avg_offset  # Long AVG below
-        tp_side = "short"
-        avg_side = "long"
-    else:  # short
-        tp_price = avg_price - tp_offset  # Long TP below
-        avg_price_target = avg_price + avg_offset  # Short AVG above
-        tp_side = "long" 
-        avg_side = "short"
+    tp_offset, avg_offset, tp_lots, avg_lots = _STRATEGY_PARAMS.get(lots, _STRATEGY_PARAMS_DEFAULT)
+    # Long: TP above / AVG below; short: mirrored
+    sign = 1 if side == "long" else -1
     
     return {
-        "tp_price": tp_price,
-        "tp_side": tp_side,
+        "tp_price": avg_price + sign * tp_offset,
+        "tp_side": "short" if sign > 0 else "long",
         "tp_lots": tp_lots,
-        "avg_price": avg_price_target,
-        "avg_side": avg_side,
+        "avg_price": avg_price - sign * avg_offset,
+        "avg_side": "long" if sign > 0 else "short",
         "avg_lots": avg_lots,
         "position_direction": side
     }
 
 
+def _strategy_position_info(position: Dict[str, Any]) -> Dict[str, Any]:
+    """Build calculate_strategy_prices' input from an extract_position_data result."""
+    return {
+        "position_lots": _parse_lots_from_size(position.get("size")) or 0,
+        "position_side": _infer_position_direction_from_position(position),
+        "position_avg_price": _safe_float(_PRICE_CLEAN_RE.sub("", position.get("entry_price") or "")) or 0.0,
+    }
+
+
 def implement_haider_strategy(page: Page) -> Dict[str, Any]:
     """Implement the Haider Strategy by placing AVG and TP orders based on current position."""
     log("📈 Implementing Haider Strategy...")
     
-    # Get current position data
-    position_data = extract_position_data(page)
-    if not position_data.get("success") or not position_data.get("position"):
-        return {"success": False, "error": "No position found"}
+    # Get current position data (flat row: size, entry_price, side, ...)
+    position = extract_position_data(page)
+    position_info = _strategy_position_info(position)
+    lots = position_info["position_lots"]
+    direction = position_info["position_side"]
+    avg_price = position_info["position_avg_price"]
     
-    position = position_data["position"]
-    size = float(position.get("size", "0"))
-    avg_price = float(position.get("avg_price", "0"))
-    
-    if size == 0:
+    if not position.get("has_position") or lots == 0 or direction not in ("long", "short"):
         return {"success": False, "error": "No open position"}
     
-    # Determine position direction and lots
-    is_long = size > 0
-    lots = abs(size)
-    direction = "long" if is_long else "short"
+    if not avg_price:
+        # Entry price unreadable: anchor on the row's mark price, else one read of the page's mark price
+        mark_txt = position.get("mark_price")
+        if not mark_txt:
+            try:
+                mark_txt = page.evaluate(_MARK_PRICE_EXPR)
+            except Exception:
+                mark_txt = None
+        avg_price = _safe_float(_PRICE_CLEAN_RE.sub("", mark_txt or "")) or 0.0
+        if not avg_price:
+            return {"success": False, "error": "Position price unavailable"}
+        log_debug("Entry price unreadable, anchoring strategy on mark price %s", avg_price)
+        position_info["position_avg_price"] = avg_price
     
     log(f"📊 Current position: {direction.upper()} {lots} lots @ ${avg_price:,.2f}")
     
     # Calculate strategy prices based on position size
-    position_info = {
-        "position_lots": lots,
-        "position_side": direction,
-        "position_avg_price": avg_price
-    }
-    
     strategy_prices = calculate_strategy_prices(position_info)
     
     # Place orders
     orders_placed = []
     
     try:
-        # Place TP order (opposite direction)
-        if strategy_prices['tp_lots'] > 0:
-            log(f"🎯 Placing TP order: {strategy_prices['tp_side']} {int(strategy_prices['tp_lots'])} lots @ ${strategy_prices['tp_price']:,.2f}")
-            tp_result = place_limit_order(page, strategy_prices['tp_side'], 
-                                        strategy_prices['tp_price'], 
-                                        int(strategy_prices['tp_lots']))
-            if tp_result.get("success"):
-                orders_placed.append(f"TP: {strategy_prices['tp_side']} {int(strategy_prices['tp_lots'])} lots @ {strategy_prices['tp_price']:,.2f}")
-        
-        # Place AVG order (same direction) - only if lots < 9
-        if strategy_prices['avg_lots'] > 0:
-            log(f"📈 Placing AVG order: {strategy_prices['avg_side']} {int(strategy_prices['avg_lots'])} lots @ ${strategy_prices['avg_price']:,.2f}")
-            avg_result = place_limit_order(page, strategy_prices['avg_side'],
-                                         strategy_prices['avg_price'],
-                                         int(strategy_prices['avg_lots']))
-            if avg_result.get("success"):
-                orders_placed.append(f"AVG: {strategy_prices['avg_side']} {int(strategy_prices['avg_lots'])} lots @ {strategy_prices['avg_price']:,.2f}")
+        # TP order (opposite direction), then AVG order (same direction) - AVG only if lots < 9
+        batch = []
+        for kind, label in (("tp", "TP"), ("avg", "AVG")):
+            kind_lots = int(strategy_prices[f'{kind}_lots'])
+            if kind_lots > 0:
+                log(f"🎯 Placing {label} order: {strategy_prices[f'{kind}_side']} {kind_lots} lots @ ${strategy_prices[f'{kind}_price']:,.2f}")
+                batch.append((label, {"side": strategy_prices[f'{kind}_side'], "price": strategy_prices[f'{kind}_price'], "lots": kind_lots}))
+        
+        # Submit both, then verify them together
+        results = place_limit_orders_batch(page, [o for _, o in batch])
+        for (label, o), res in zip(batch, results):
+            if res.get("ok"):
+                orders_placed.append(f"{label}: {o['side']} {o['lots']} lots @ {o['price']:,.2f}")
         
         if orders_placed:
             log(f"✅ Strategy implemented successfully! Placed {len(orders_placed)} orders")
@@ -2619,6 +2975,122 @@ def run_strategy_tests(page: Page) -> None:
     log("🧪 Testing Complete!")
 
 
+# Locator handles per (page, selector), and which selector last worked per UI action.
+# The latter is persisted to debuuug/selector_cache.json so later runs try the winner first.
+_SELECTOR_CACHE: Dict[tuple, Any] = {}
+_SELECTOR_CACHE_FILE = DEBUG_DIR / "selector_cache.json"
+try:
+    _GOOD_SELECTORS: Dict[str, str] = json.loads(_SELECTOR_CACHE_FILE.read_text(encoding="utf-8"))
+except Exception:
+    _GOOD_SELECTORS = {}
+
+# Button/dialog selectors for the close/cancel-all helpers, built once at import
+_DIALOG_SEL = "[role=dialog]"
+_CLOSE_ALL_SEL = 'button[data-testid="close-all-positions"]'
+# Confirm buttons are looked up inside the dialog only, so the button that opened it
+# (e.g. "Close All Positions") can never satisfy the wait or be clicked again as "confirm"
+_CLOSE_ALL_CONFIRM_SELS = (
+    '[role=dialog] button:has-text("Confirm")',
+    '[role=dialog] button:has-text("Yes")',
+    '[role=dialog] button[data-testid="confirm-button"]',
+)
+# Close (X) control in the position row: the specific matches are probed as one union, and a
+# bare icon button is tried only after that and only inside the row, never page-wide
+_CLOSE_POS_UNION = (
+    "button:has-text('Close'), [data-testid*='close'], svg[data-palette='CrossIcon'], "
+    "button[aria-label*='Close'], button[title*='Close']"
+)
+_CLOSE_POS_ICON_SEL = "button:has(svg)"
+_CLOSE_POS_CONFIRM_SELS = (
+    "[role=dialog] button:has-text('Confirm')",
+    "[role=dialog] button:has-text('Yes')",
+    "[role=dialog] button:has-text('Close Position')",
+)
+_CANCEL_ALL_SELS = (
+    'button:has-text("Cancel All Orders")',
+    'span:has-text("Cancel All Orders")',
+    '[data-testid*="cancel-all"]',
+)
+_CANCEL_ALL_CONFIRM_SELS = (
+    '[role=dialog] button:has-text("Confirm")',
+    '[role=dialog] button:has-text("Yes")',
+    '[role=dialog] button:has-text("Cancel Orders")',
+)
+
+
+def _cached_locator(page: Page, sel: str):
+    return _SELECTOR_CACHE.setdefault((id(page), sel), page.locator(sel).first)
+
+
+# (page, button) -> monotonic time it was last found missing; cleared when the page navigates
+_NEG_CACHE: Dict[tuple, float] = {}
+_NEG_CACHE_TTL = 5.0
+_NEG_NAV_HOOKED: set = set()
+
+
+def _known_absent(page: Page, key: str) -> bool:
+    """True if the button was found missing on this page within the last _NEG_CACHE_TTL seconds."""
+    return time.monotonic() - _NEG_CACHE.get((id(page), key), float("-inf")) < _NEG_CACHE_TTL
+
+
+def _mark_absent(page: Page, key: str) -> None:
+    pid = id(page)
+    _NEG_CACHE[(pid, key)] = time.monotonic()
+    if pid not in _NEG_NAV_HOOKED:
+        try:
+            page.on("framenavigated", lambda _frame: [_NEG_CACHE.pop(k, None) for k in list(_NEG_CACHE) if k[0] == pid])
+            _NEG_NAV_HOOKED.add(pid)
+        except Exception:
+            pass
+
+
+def _known_good_first(action: str, selectors: Sequence[str]) -> Sequence[str]:
+    """Return selectors with the one that last worked for action moved to the front."""
+    good = _GOOD_SELECTORS.get(action)
+    if good in selectors and selectors[0] != good:
+        return [good] + [s for s in selectors if s != good]
+    return selectors
+
+
+def _remember_selector(action: str, sel: str) -> None:
+    if _GOOD_SELECTORS.get(action) == sel:
+        return
+    _GOOD_SELECTORS[action] = sel
+    _SNAP_POOL.submit(_write_text_file, str(_SELECTOR_CACHE_FILE), json.dumps(_GOOD_SELECTORS, indent=2))
+
+
+def _wait_any_visible(page: Page, selectors: Sequence[str], timeout_ms: int = 1000) -> bool:
+    """Wait until any of the CSS selectors is visible (e.g. an optional confirm dialog); False on timeout."""
+    try:
+        page.locator(", ".join(selectors)).first.wait_for(state="visible", timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+def _wait_dialog_closed(page: Page, wait_s: float, timeout_ms: int = 3000) -> None:
+    """Wait for any confirm dialog to detach, then a short settle (wait_s capped at 300ms)."""
+    try:
+        page.wait_for_selector(_DIALOG_SEL, state="detached", timeout=timeout_ms)
+    except Exception:
+        pass
+    time.sleep(min(wait_s, 0.3))
+
+
+def _click_first_visible(page: Page, action: str, selectors: Sequence[str], timeout: int = 1500) -> Optional[str]:
+    """Click the first visible selector (known-good one first) and return it, or None."""
+    for sel in _known_good_first(action, selectors):
+        try:
+            loc = _cached_locator(page, sel)
+            if loc.is_visible():
+                loc.click(timeout=timeout)
+                _remember_selector(action, sel)
+                return sel
+        except Exception:
+            continue
+    return None
+
+
 def close_all_positions(page: Page, wait_s: float = 3.0) -> Dict[str, Any]:
     """Close all open positions using the 'Close All Positions' button.
     
@@ -2628,36 +3100,27 @@ def close_all_positions(page: Page, wait_s: float = 3.0) -> Dict[str, Any]:
     try:
         log("🚨 CLOSING ALL POSITIONS - This is dangerous in live trading!")
         
-        # Look for the Close All Positions button
-        close_all_selector = 'button[data-testid="close-all-positions"]'
-        
-        if page.locator(close_all_selector).count() == 0:
+        # Click the Close All Positions button directly (click() waits for it)
+        if _known_absent(page, _CLOSE_ALL_SEL):
+            log("❌ Close All Positions button not found (cached)")
+            return {"success": False, "error": "Button not found"}
+        try:
+            _cached_locator(page, _CLOSE_ALL_SEL).click(timeout=1500)
+        except Exception:
+            _mark_absent(page, _CLOSE_ALL_SEL)
             log("❌ Close All Positions button not found")
             return {"success": False, "error": "Button not found"}
-        
-        # Click the button
-        page.locator(close_all_selector).click()
         log("🔧 Clicked 'Close All Positions' button")
         
-        # Wait for any confirmation dialog and handle it
-        page.wait_for_timeout(1000)  # Wait for potential dialog
-        
         # Look for confirmation dialog and confirm if needed
-        confirm_selectors = [
-            'button:has-text("Confirm")',
-            'button:has-text("Yes")', 
-            'button:has-text("Close")',
-            'button[data-testid="confirm-button"]'
-        ]
+        _wait_any_visible(page, _CLOSE_ALL_CONFIRM_SELS)  # Wait for potential dialog
         
-        for selector in confirm_selectors:
-            if page.locator(selector).count() > 0:
-                page.locator(selector).click()
-                log(f"🔧 Confirmed action with {selector}")
-                break
+        selector = _click_first_visible(page, "close_all_confirm", _CLOSE_ALL_CONFIRM_SELS)
+        if selector:
+            log(f"🔧 Confirmed action with {selector}")
         
-        # Wait for the action to complete
-        time.sleep(wait_s)
+        # Wait for the dialog to go away rather than a flat delay
+        _wait_dialog_closed(page, wait_s)
         
         log("✅ Close All Positions action completed")
         return {"success": True, "action": "close_all_positions"}
@@ -2676,71 +3139,39 @@ def close_position_by_symbol(page: Page, symbol: str = "BTCUSD", wait_s: float =
         log(f"🚨 CLOSING POSITION for {symbol}")
         # Ensure Positions tab is active
         try:
-            _activate_tab(page, r"^Positions$")
+            _ensure_tab(page, "Positions")
             page.wait_for_timeout(300)
         except Exception:
             pass
 
         # Find the BTCUSD row first
-        row = page.locator("tr:has(td:has-text('BTCUSD'))").first
+        row = _cached_locator(page, _POSITION_ROW_SEL)
         if row.count() == 0:
             row = page.locator("tr:has(:text('BTCUSD'))").first
         if row.count() == 0:
-            # Fallback to whole-page search if row not found
-            row = None
-
-        # Define close button selectors
-        close_selectors = [
-            "button:has-text('Close')",
-            "button:has(svg)",
-            "[data-testid*='close']",
-            "svg[data-palette='CrossIcon']",
-            "xpath=.//button[contains(@aria-label,'Close') or contains(@title,'Close')]",
-        ]
-
-        def try_click_close(scope) -> bool:
-            for selector in close_selectors:
-                try:
-                    cand = scope.locator(selector).first if scope else page.locator(selector).first
-                    if cand and cand.count() > 0 and cand.is_visible():
-                        try:
-                            cand.scroll_into_view_if_needed(timeout=800)
-                        except Exception:
-                            pass
-                        cand.click(timeout=1500)
-                        log(f"🔧 Clicked close button: {selector}")
-                        return True
-                except Exception:
-                    continue
-            return False
+            log(f"❌ No {symbol} position row found")
+            return {"success": False, "error": "Position row not found"}
 
+        # click() auto-waits and auto-scrolls, so a hit is a single round-trip
         clicked = False
-        if row and row.count() > 0:
-            clicked = try_click_close(row)
-        if not clicked:
-            clicked = try_click_close(page)
+        for selector in (_CLOSE_POS_UNION, _CLOSE_POS_ICON_SEL):
+            try:
+                row.locator(selector).locator("visible=true").first.click(timeout=800)
+            except Exception:
+                continue
+            log(f"🔧 Clicked close button: {selector}")
+            clicked = True
+            break
         if not clicked:
-            log("❌ No close button found in position row/page")
+            log("❌ No close button found in position row")
             return {"success": False, "error": "Close button not found"}
 
         # Wait for confirmation dialog and confirm
-        page.wait_for_timeout(1000)
-        confirm_selectors = [
-            "button:has-text('Confirm')",
-            "button:has-text('Yes')",
-            "button:has-text('Close Position')",
-        ]
-        for confirm_sel in confirm_selectors:
-            try:
-                btn = page.locator(confirm_sel).first
-                if btn and btn.count() > 0 and btn.is_visible():
-                    btn.click(timeout=1200)
-                    log("🔧 Confirmed position close")
-                    break
-            except Exception:
-                continue
+        _wait_any_visible(page, _CLOSE_POS_CONFIRM_SELS)
+        if _click_first_visible(page, "close_position_confirm", _CLOSE_POS_CONFIRM_SELS, timeout=1200):
+            log("🔧 Confirmed position close")
 
-        time.sleep(wait_s)
+        _wait_dialog_closed(page, wait_s)
         log(f"✅ Position close action completed for {symbol}")
         return {"success": True, "action": "close_position", "symbol": symbol}
 
@@ -2754,38 +3185,25 @@ def cancel_all_orders_button(page: Page, wait_s: float = 2.0) -> Dict[str, Any]:
     try:
         log("🧹 Cancelling all orders using Cancel All Orders button")
         
-        # Look for Cancel All Orders button
-        cancel_all_selectors = [
-            'button:has-text("Cancel All Orders")',
-            'span:has-text("Cancel All Orders")',
-            '[data-testid*="cancel-all"]'
-        ]
-        
-        for selector in cancel_all_selectors:
-            if page.locator(selector).count() > 0:
-                page.locator(selector).click()
-                log(f"🔧 Clicked Cancel All Orders button: {selector}")
-                
-                # Wait for confirmation
-                page.wait_for_timeout(1000)
-                
-                # Handle confirmation dialog
-                confirm_selectors = [
-                    'button:has-text("Confirm")',
-                    'button:has-text("Yes")',
-                    'button:has-text("Cancel Orders")'
-                ]
-                
-                for confirm_sel in confirm_selectors:
-                    if page.locator(confirm_sel).count() > 0:
-                        page.locator(confirm_sel).click()
-                        log("🔧 Confirmed order cancellation")
-                        break
-                
-                time.sleep(wait_s)
-                log("✅ Cancel All Orders action completed")
-                return {"success": True, "action": "cancel_all_orders"}
+        # Look for Cancel All Orders button (skip the probe if it was just found missing)
+        if _known_absent(page, "cancel_all"):
+            log("❌ Cancel All Orders button not found (cached)")
+            return {"success": False, "error": "Button not found"}
+        selector = _click_first_visible(page, "cancel_all", _CANCEL_ALL_SELS)
+        if selector:
+            log(f"🔧 Clicked Cancel All Orders button: {selector}")
+            
+            # Handle confirmation dialog
+            _wait_any_visible(page, _CANCEL_ALL_CONFIRM_SELS)  # Wait for confirmation
+            
+            if _click_first_visible(page, "cancel_all_confirm", _CANCEL_ALL_CONFIRM_SELS):
+                log("🔧 Confirmed order cancellation")
+            
+            _wait_dialog_closed(page, wait_s)
+            log("✅ Cancel All Orders action completed")
+            return {"success": True, "action": "cancel_all_orders"}
         
+        _mark_absent(page, "cancel_all")
         log("❌ Cancel All Orders button not found")
         return {"success": False, "error": "Button not found"}
         
@@ -2799,20 +3217,13 @@ def cancel_orders(page: Page, side: Optional[str] = None, price_substr: Optional
     return cancel_open_orders(page, side=side, price_substr=price_substr, max_to_cancel=max_to_cancel)
 
 
+_SIGN_SIDE = {"+": "long", "-": "short"}
+
+
 def _infer_position_side(size_text: Optional[str]) -> Optional[str]:
     """Infer 'long' or 'short' from a position size string (e.g., '+0.001 BTC', '-0.001 BTC')."""
-    if not size_text:
-        return None
-    s = size_text.strip().lower()
-    if s.startswith("+"):
-        return "long"
-    if s.startswith("-"):
-        return "short"
-    if "long" in s:
-        return "long"
-    if "short" in s:
-        return "short"
-    return None
+    s = (size_text or "").strip().lower()
+    return _SIGN_SIDE.get(s[:1]) or ("long" if "long" in s else "short" if "short" in s else None)
 
 
 def watch_seed_phase(page: Page, timeout_s: float = 300.0) -> Dict[str, Any]:
@@ -2823,13 +3234,16 @@ def watch_seed_phase(page: Page, timeout_s: float = 300.0) -> Dict[str, Any]:
     """
     try:
         # Capture initial state
-        pos = extract_position_data(page)
+        state = extract_position_and_orders(page)
+        pos = state["position"]
         pos_side = _infer_position_side(pos.get("size")) or "unknown"
-        oinfo = extract_open_orders(page)
-        initial = oinfo.get("orders", [])
+        initial = state["orders"].get("orders", [])
         if len(initial) < 1:
             return {"result": "error", "error": "no_open_orders", "position_side": pos_side, "initial": initial, "final": initial}
+        base_len = len(initial)
+        base_fast = _fast_orders_sig(initial)
         base_sig = _orders_signature(initial)
+        rows_sig = state["orders"].get("sig")
         # Side mapping for initial orders
         def norm_side(x: Optional[str]) -> Optional[str]:
             if not x:
@@ -2844,30 +3258,33 @@ def watch_seed_phase(page: Page, timeout_s: float = 300.0) -> Dict[str, Any]:
         # Loop until one order disappears or timeout
         deadline = time.time() + max(5.0, timeout_s)
         final = initial
+        version = _orders_version(page)
         while time.time() < deadline:
-            time.sleep(1.0)
+            # Block in the browser until the Open Orders table mutates; the 30s slice only
+            # bounds how long a stale observer (re-rendered table) can go unnoticed
+            _wait_orders_change(page, version, min(30.0, deadline - time.time()), fallback_s=1.0)
+            # Snapshot the counter before reading so a change mid-read wakes the next wait at once
+            version = _orders_version(page)
             try:
-                now_orders = extract_open_orders(page).get("orders", [])
+                now_info = extract_open_orders(page, sig_hint=rows_sig)
             except Exception:
                 continue
+            now_orders = now_info.get("orders", [])
+            rows_sig = now_info.get("sig")
+            # Cheap checks first: same length and same (side, price, qty) tuples means unchanged
+            if len(now_orders) == base_len and _fast_orders_sig(now_orders) == base_fast:
+                continue
             sig = _orders_signature(now_orders)
             if sig != base_sig:
                 final = now_orders
                 # Identify which side disappeared
-                init_sides = sorted([norm_side(o.get("side")) or "?" for o in initial])
-                now_sides = sorted([norm_side(o.get("side")) or "?" for o in now_orders])
-                # Find the missing side label
-                missing: Optional[str] = None
-                tmp = now_sides.copy()
-                for s in init_sides:
-                   if s in tmp:
-                       tmp.remove(s)
-                   else:
-                       missing = s
-                       break
+                init_sides = Counter(norm_side(o.get("side")) or "?" for o in initial)
+                now_sides = Counter(norm_side(o.get("side")) or "?" for o in now_orders)
+                # Find the missing side label: whatever the initial multiset has that the current one lacks
+                missing: Optional[str] = next(iter(init_sides - now_sides), None)
                 if missing is None:
                     # fallback: use length change
-                    missing = "long" if init_sides.count("long") > now_sides.count("long") else "short"
+                    missing = "long" if init_sides["long"] > now_sides["long"] else "short"
                 # If the missing side equals position side → AVG filled; else TP filled
                 if pos_side != "unknown" and missing in ("long", "short"):
                     result = "avg" if missing == pos_side else "tp"
@@ -2880,25 +3297,68 @@ def watch_seed_phase(page: Page, timeout_s: float = 300.0) -> Dict[str, Any]:
         return {"result": "error", "error": str(e), "position_side": None, "initial": [], "final": []}
 
 
-def monitor_positions(page: Page, reattach_cb=None) -> None:
-    """Continuously monitor position data"""
+def _open_orders_page(page: Page) -> Optional[Page]:
+    """Open a second trading tab in page's context and park it on Open Orders; None on failure."""
+    try:
+        orders_page = page.context.new_page()
+    except Exception as e:
+        log(f"⚠️ Could not open a dedicated Open Orders tab: {e}")
+        return None
+    try:
+        orders_page.goto(page.url or DELTA_TRADE_URL, wait_until="domcontentloaded")
+        try:
+            orders_page.locator(_TRADE_READY_SEL).first.wait_for(state="visible", timeout=15000)
+        except Exception:
+            pass
+        if _ensure_tab(orders_page, "Open Orders"):
+            return orders_page
+        log("⚠️ Open Orders tab not found in the dedicated tab; reading orders from the main tab")
+    except Exception as e:
+        log(f"⚠️ Could not open a dedicated Open Orders tab: {e}")
+    finally:
+        # new_page() opens in the foreground; put the Positions tab back in front so Edge
+        # doesn't throttle it as a hidden tab
+        try:
+            page.bring_to_front()
+        except Exception:
+            pass
+    try:
+        orders_page.close()
+    except Exception:
+        pass
+    return None
+
+
+def monitor_positions(page: Page, reattach_cb=None, interval: Optional[float] = None) -> None:
+    """Continuously monitor position data.
+
+    interval overrides POSITIONS_INTERVAL, the unobserved polling ceiling.
+    """
+    pos_ceiling = float(interval or POSITIONS_INTERVAL)
     log("🔍 Starting position monitoring...")
     log("📊 Monitoring: Size, Entry Price, Mark Price, UPNL")
-    log(f"⏱️ Position interval: {POSITIONS_INTERVAL}s, Orders interval: {ORDERS_INTERVAL}s")
+    log(f"⏱️ Position interval: {POSITIONS_FAST_INTERVAL}-{pos_ceiling:g}s (adaptive), Orders interval: {ORDERS_INTERVAL}s")
     log("🛑 Press Ctrl+C to stop monitoring")
     
-    # Initial wait to allow the page to finish rendering
+    # Initial wait to allow the page to finish rendering (returns as soon as a table is up)
     try:
-        log("⏳ Waiting 10 seconds for page to fully render…")
-        time.sleep(10)
+        log("⏳ Waiting up to 10 seconds for page to fully render…")
+        page.locator("table").first.wait_for(state="visible", timeout=10000)
     except Exception:
         pass
 
-    last_display = ""
+    last_pos_key = None
+    pos_interval = float(POSITIONS_FAST_INTERVAL)
+    pos_version: Optional[int] = None
+    pos_dirty = False
     last_position_size = None
     cached_open_orders: Optional[Dict[str, Any]] = None
     last_pos_ts = 0.0
     last_orders_ts = 0.0
+    # Orders come from their own tab when possible so the main tab stays on Positions
+    orders_page = _open_orders_page(page) if ORDERS_DEDICATED_TAB and not DELTA_API_ENABLED else None
+    if orders_page is not None:
+        log("🗂️ Reading Open Orders from a dedicated tab")
     
     try:
         while True:
@@ -2906,14 +3366,22 @@ def monitor_positions(page: Page, reattach_cb=None) -> None:
                 now = time.time()
 
                 # Positions task
-                if now - last_pos_ts >= POSITIONS_INTERVAL:
+                if now - last_pos_ts >= pos_interval:
                     try:
-                        data = extract_position_data(page)
-                        # Format for display
-                        display = format_position_display(data)
-                        if display != last_display:
-                            print(display)
-                            last_display = display
+                        pos_dirty = False
+                        pos_version = _positions_version(page)
+                        data = fetch_position_api() or extract_position_data(page)
+                        # Poll fast while the position moves, back off x1.5 per quiet tick up to the ceiling
+                        pos_key = tuple(map(data.get, _POSITION_FIELDS))
+                        if pos_key == last_pos_key:
+                            # With the table observed, timed reads are only a watchdog and may back off further
+                            ceiling = max(POSITIONS_WATCHDOG_INTERVAL, pos_ceiling) if pos_version is not None else pos_ceiling
+                            pos_interval = min(pos_interval * 1.5, float(ceiling))
+                        else:
+                            pos_interval = float(POSITIONS_FAST_INTERVAL)
+                            last_pos_key = pos_key
+                            # Only format and print when a field changed (the display embeds a timestamp)
+                            print(format_position_display(data))
                         # Track size for optional immediate orders refresh
                         current_size = data.get("size")
                         if current_size != last_position_size:
@@ -2928,7 +3396,12 @@ def monitor_positions(page: Page, reattach_cb=None) -> None:
                 # Open Orders task
                 if now - last_orders_ts >= ORDERS_INTERVAL:
                     try:
-                        orders_info = extract_open_orders(page)
+                        if orders_page is not None and orders_page.is_closed():
+                            log("⚠️ Dedicated Open Orders tab was closed; reading orders from the main tab")
+                            orders_page = None
+                        orders_info = fetch_open_orders_api() or extract_open_orders(
+                            orders_page or page, sig_hint=(cached_open_orders or {}).get("sig")
+                        )
                         cached_open_orders = orders_info
                         orders = orders_info.get("orders", []) if orders_info else []
                         if orders:
@@ -2937,19 +3410,30 @@ def monitor_positions(page: Page, reattach_cb=None) -> None:
                                 log(f"  {i}) {o.get('side','?')} Size={o.get('size','?')} Limit Price={o.get('price','?')}")
                         else:
                             log("📭 No open orders detected for BTCUSD")
-                        # Return to Positions after reading orders
-                        try:
-                            _activate_tab(page, r"^Positions$")
-                            page.wait_for_timeout(150)
-                        except Exception:
-                            pass
+                        # Return to Positions after reading orders from the main tab
+                        if orders_page is None:
+                            try:
+                                _ensure_tab(page, "Positions")
+                                page.wait_for_timeout(150)
+                            except Exception:
+                                pass
                     except Exception as oo_err:
                         log(f"❌ Failed to refresh open orders: {oo_err}")
                     finally:
                         last_orders_ts = now
 
-                # Base loop sleep
-                time.sleep(BASE_LOOP_SLEEP)
+                # Sleep until the next task is due; while the positions table is observable, a DOM
+                # change ends the wait early and makes the position due at the fast cadence.
+                # The timed wake-ups remain as a watchdog for changes the observer can't see.
+                next_due = min(last_pos_ts + pos_interval, last_orders_ts + ORDERS_INTERVAL)
+                wait_s = max(BASE_LOOP_SLEEP, next_due - time.time())
+                if pos_version is not None and not pos_dirty:
+                    if _wait_positions_change(page, pos_version, wait_s):
+                        pos_dirty = True
+                        pos_interval = float(POSITIONS_FAST_INTERVAL)
+                else:
+                    # wait_for_timeout keeps Playwright's event dispatch running meanwhile
+                    page.wait_for_timeout(wait_s * 1000)
                 
             except KeyboardInterrupt:
                 log("🛑 Position monitoring stopped by user")
@@ -2967,65 +3451,146 @@ def monitor_positions(page: Page, reattach_cb=None) -> None:
                             log("✅ Reattached successfully.")
                     except Exception as re_err:
                         log(f"❌ Reattach failed: {re_err}")
-                time.sleep(BASE_LOOP_SLEEP)  # Continue monitoring despite errors
+                # Continue monitoring despite errors; keep Playwright's event dispatch running while idle
+                try:
+                    page.wait_for_timeout(BASE_LOOP_SLEEP * 1000)
+                except Exception:
+                    time.sleep(BASE_LOOP_SLEEP)
                 
     except Exception as e:
         log(f"❌ Fatal monitoring error: {e}")
+    finally:
+        if orders_page is not None:
+            try:
+                orders_page.close()
+            except Exception:
+                pass
+
+
+# One CDP connection per Playwright instance, and the last trading tab found per target URL.
+# Reattach reuses both while they are alive; a dropped connection empties the page cache.
+_CDP_BROWSERS: Dict[int, Browser] = {}
+# Tab matching for find_page; the configured URL is lower-cased once at import
+_TRADE_PATH = "/app/futures/trade/"
+_DEMO_HOST = "demo.delta.exchange"
+_TARGET_LOWER = DELTA_TRADE_URL.lower()
 
 
-def connect_to_edge_existing_tab(target_url: str, timeout_s: int = 20, reuse_playwright=None):
+def _tab_score(url: str, cookie_count: int) -> int:
+    """Rank a candidate trading tab: demo host and trade path up, login pages down, plus Delta cookies."""
+    return (2 if _DEMO_HOST in url else 0) + (3 if _TRADE_PATH in url else 0) - (5 if "login" in url else 0) + cookie_count
+
+
+# First thing a freshly opened trade tab renders that the bot can work with
+_TRADE_READY_SEL = "input[name='orderPrice'], table"
+_PAGE_CACHE: Dict[str, Page] = {}
+# Delta cookie count per browser context, kept once a context is seen logged in
+_CTX_COOKIE_SCORE: Dict[int, int] = {}
+
+
+def _cdp_browser(playwright) -> Browser:
+    key = id(playwright)
+    browser = _CDP_BROWSERS.get(key)
+    if browser is not None:
+        try:
+            if browser.is_connected():
+                return browser
+        except Exception:
+            pass
+    browser = playwright.chromium.connect_over_cdp(f"http://127.0.0.1:{CDP_PORT}")
+    try:
+        browser.on("disconnected", lambda _b: (_CDP_BROWSERS.pop(key, None), _PAGE_CACHE.clear(), _TRADE_READY_URLS.clear()))
+    except Exception:
+        pass
+    _CDP_BROWSERS[key] = browser
+    log("✅ Connected to Edge via CDP")
+    return browser
+
+
+def connect_to_edge_existing_tab(target_url: str, timeout_s: int = 20, reuse_playwright=None, create_if_missing: bool = False, first_attach: bool = True):
     """Attach to existing Edge via CDP and return page for the matching tab.
 
     IMPORTANT: Edge must be running with --remote-debugging-port=9222.
-    This function will NOT launch a new Edge window.
+    This function will NOT launch a new Edge window. With create_if_missing, a
+    missing trading tab is opened over CDP in the existing session instead of waited for.
+    Reattaches pass first_attach=False to skip the load-state waits for a tab that was
+    already rendered (a tab opened here is still waited for).
     """
     log(f"🌐 Attaching to existing Edge (CDP) at http://127.0.0.1:{CDP_PORT} …")
     playwright = reuse_playwright or sync_playwright().start()
     try:
-        browser: Browser = playwright.chromium.connect_over_cdp(f"http://127.0.0.1:{CDP_PORT}")
-        log("✅ Connected to Edge via CDP")
+        browser: Browser = _cdp_browser(playwright)
+
+        cached = _PAGE_CACHE.get(target_url)
+        if cached is not None:
+            try:
+                if not cached.is_closed() and cached.context.browser is browser:
+                    log("✅ Reusing cached trading tab")
+                    return cached
+            except Exception:
+                pass
+            _PAGE_CACHE.pop(target_url, None)
+
+        target_l = _TARGET_LOWER if target_url == DELTA_TRADE_URL else target_url.lower()
 
         def find_page() -> Optional[Page]:
-            candidates: List[Page] = []
-            for ctx in browser.contexts:
-                for p in ctx.pages:
-                    url = (p.url or "").lower()
-                    if ("demo.delta.exchange" in url) and ("/app/futures/trade/" in url):
-                        candidates.append(p)
+            # One pass over every tab, reading each URL once
+            pairs = [(p, ctx, (p.url or "").lower()) for ctx in browser.contexts for p in ctx.pages]
+            candidates = [t for t in pairs if _DEMO_HOST in t[2] and _TRADE_PATH in t[2]]
             if not candidates:
                 # fallback: any trade page
-                for ctx in browser.contexts:
-                    for p in ctx.pages:
-                        url = (p.url or "").lower()
-                        if target_url.lower() in url or "/app/futures/trade/" in url:
-                            candidates.append(p)
+                candidates = [t for t in pairs if target_l in t[2] or _TRADE_PATH in t[2]]
             if not candidates:
                 return None
-            # score candidates: prefer non-login URLs and contexts with delta cookies
-            def score(p: Page) -> int:
-                s = 0
-                url = (p.url or "").lower()
-                if "demo.delta.exchange" in url:
-                    s += 2
-                if "/app/futures/trade/" in url:
-                    s += 3
-                if "login" in url:
-                    s -= 5
+            # A lone candidate, or candidates sharing one context (equal cookie scores), is decided
+            # by the URL alone; no cookies() round-trip needed
+            if len(candidates) == 1:
+                return candidates[0][0]
+            if len({id(t[1]) for t in candidates}) == 1:
+                return max(candidates, key=lambda t: _tab_score(t[2], 0))[0]
+            # score candidates: prefer non-login URLs and contexts with delta cookies.
+            # Cookies are fetched at most once per context per scan (and never again once logged in)
+            scan_scores: Dict[int, int] = {}
+
+            def ctx_cookie_score(ctx) -> int:
+                key = id(ctx)
+                if key in _CTX_COOKIE_SCORE:
+                    return _CTX_COOKIE_SCORE[key]
+                if key in scan_scores:
+                    return scan_scores[key]
                 try:
-                    cookies = p.context.cookies()
-                    delta_cookies = [c for c in cookies if "delta.exchange" in (c.get("domain") or "")]
-                    s += min(len(delta_cookies), 5)
+                    cookies = ctx.cookies()
                 except Exception:
-                    pass
-                return s
-            candidates.sort(key=score, reverse=True)
-            return candidates[0]
+                    cookies = []
+                n = min(sum(1 for c in cookies if "delta.exchange" in (c.get("domain") or "")), 5)
+                scan_scores[key] = n
+                if n:
+                    _CTX_COOKIE_SCORE[key] = n  # a logged-out context is re-checked next scan
+                return n
 
-        # Wait briefly for the user-opened tab to appear
+            return max(candidates, key=lambda t: _tab_score(t[2], ctx_cookie_score(t[1])))[0]
+
+        # Wait briefly for the user-opened tab to appear (or open it ourselves)
         deadline = time.time() + timeout_s
         page = find_page()
+        opened = False
+        if page is None and create_if_missing:
+            log(f"🔗 Trading tab not open; opening {target_url} in the existing Edge session")
+            ctx = browser.contexts[0] if browser.contexts else browser.new_context()
+            page = ctx.new_page()
+            page.goto(target_url, wait_until="domcontentloaded", timeout=timeout_s * 1000)
+            opened = True
         while page is None and time.time() < deadline:
-            time.sleep(0.5)
+            # Wake as soon as a new tab opens; the 2s cap also catches an existing tab navigating
+            try:
+                ctxs = browser.contexts
+                wait_ms = max(100, min(2000, int((deadline - time.time()) * 1000)))
+                if ctxs:
+                    ctxs[0].wait_for_event("page", timeout=wait_ms)
+                else:
+                    time.sleep(0.5)
+            except Exception:
+                pass
             page = find_page()
 
         if page is None:
@@ -3033,15 +3598,28 @@ def connect_to_edge_existing_tab(target_url: str, timeout_s: int = 20, reuse_pla
                 "Trading tab not found in existing Edge session. Make sure the URL is open in the logged-in Edge window."
             )
 
+        # Leave the tab where the user has it; only surface it if it is hidden, since Edge
+        # throttles hidden tabs and the scraped DOM would go stale
         try:
-            page.bring_to_front()
-        except Exception:
-            pass
-        try:
-            page.wait_for_load_state("domcontentloaded", timeout=5000)
+            if page.evaluate("document.visibilityState") == "hidden":
+                page.bring_to_front()
         except Exception:
             pass
+        if first_attach or opened:
+            try:
+                page.wait_for_load_state("domcontentloaded", timeout=5000)
+            except Exception:
+                pass
+            # The SPA renders after DOMContentLoaded: wait for the order form or a data table to show up
+            try:
+                page.locator(_TRADE_READY_SEL).first.wait_for(state="visible", timeout=15000)
+            except Exception:
+                try:
+                    page.wait_for_load_state("networkidle", timeout=8000)
+                except Exception:
+                    pass
 
+        _PAGE_CACHE[target_url] = page
         return page
     except Exception as e:
         log(f"❌ Could not attach to existing Edge. Ensure Edge is started with --remote-debugging-port={CDP_PORT}.")
@@ -3049,7 +3627,50 @@ def connect_to_edge_existing_tab(target_url: str, timeout_s: int = 20, reuse_pla
         raise
 
 
+def _with_retry(fn: Callable, attempts: int = 5, base: float = 0.2, cap: float = 3.0) -> Callable:
+    """Wrap fn so failures are retried up to attempts times with jittered exponential backoff."""
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        delay = base
+        for attempt in range(1, attempts + 1):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt == attempts:
+                    raise
+                log(f"⚠️ Attempt {attempt}/{attempts} failed: {e}; retrying in {delay:.1f}s")
+                time.sleep(_jittered(delay))
+                delay = min(delay * 2, cap)
+    return wrapper
+
+
+# CLI arguments each one-shot action needs before it is worth attaching to Edge
+_ACTION_REQUIRED_ARGS = {
+    "place": ("side", "price", "lots"),
+    "long": ("price", "lots"),
+    "short": ("price", "lots"),
+}
+
+
 def main() -> int:
+    # Optional one-shot actions via CLI; parsed and validated before any browser work
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--action", choices=["monitor", "place", "cancel", "seedwatch", "long", "short", "snapshot", "strategy", "adaptive", "strategymonitor", "test", "closeall", "closepos", "cancelall"], default="monitor")
+    parser.add_argument("--side", choices=["buy", "sell", "long", "short"], required=False)
+    parser.add_argument("--price", type=float, required=False)
+    parser.add_argument("--lots", type=int, required=False)
+    parser.add_argument("--priceSubstr", type=str, required=False)
+    parser.add_argument("--interval", type=float, required=False, help="Position polling ceiling in seconds (default: DELTA_MONITOR_INTERVAL or 10)")
+    try:
+        args, _ = parser.parse_known_args(sys.argv[1:])
+    except SystemExit as e:
+        # --help, or an invalid value (argparse has already printed why)
+        return e.code if isinstance(e.code, int) else 0
+    missing = [a for a in _ACTION_REQUIRED_ARGS.get(args.action, ()) if getattr(args, a) is None]
+    if missing:
+        log(f"❌ Missing {'/'.join('--' + a for a in missing)} for action={args.action}")
+        return 2
+
     debug_dir = ensure_debug_dir()
     set_log_file(debug_dir / "run.log")
 
@@ -3065,7 +3686,7 @@ def main() -> int:
             if edge_running() and allow_kill:
                 log(f"🧪 No CDP on 127.0.0.1:{CDP_PORT}. Closing Edge to relaunch with CDP…")
                 kill_edge_processes()
-                time.sleep(1)
+                _wait_edge_exit()
                 start_edge_with_cdp(DELTA_TRADE_URL, CDP_PORT)
                 if not wait_for_cdp(CDP_PORT, 12):
                     log(f"❌ CDP still not available on 127.0.0.1:{CDP_PORT} after relaunch.")
@@ -3083,33 +3704,18 @@ def main() -> int:
                         log(f"Try manually: msedge --remote-debugging-port={CDP_PORT}")
                     return 1
 
-        # 1) Open the target URL in Edge (if not already open) using default browser as a hint
-        log(f"🔗 Opening URL in default browser (Edge): {DELTA_TRADE_URL}")
-        try:
-            webbrowser.open(DELTA_TRADE_URL)
-        except Exception:
-            pass
-        log("⏳ Waiting a moment for the tab to appear…")
-        time.sleep(3)
+        # 1) The trading tab is located (or opened over CDP) by connect_to_edge_existing_tab below
 
         # 2) Attach ONLY to existing Edge (no new window)
         try:
             # Start Playwright once and reuse between reattachments
             playwright = sync_playwright().start()
-            page = connect_to_edge_existing_tab(DELTA_TRADE_URL, reuse_playwright=playwright)
+            page = connect_to_edge_existing_tab(DELTA_TRADE_URL, reuse_playwright=playwright, create_if_missing=True)
             log("✅ Attached to the existing Edge trading tab")
-
-            # Optional one-shot actions via CLI
-            parser = argparse.ArgumentParser(add_help=False)
-            parser.add_argument("--action", choices=["monitor", "place", "cancel", "seedwatch", "long", "short", "snapshot", "strategy", "adaptive", "strategymonitor", "test", "closeall", "closepos", "cancelall"], default="monitor")
-            parser.add_argument("--side", choices=["buy", "sell", "long", "short"], required=False)
-            parser.add_argument("--price", type=float, required=False)
-            parser.add_argument("--lots", type=int, required=False)
-            parser.add_argument("--priceSubstr", type=str, required=False)
-            try:
-                args, _ = parser.parse_known_args(sys.argv[1:])
-            except SystemExit:
-                args = argparse.Namespace(action="monitor", side=None, price=None, lots=None, priceSubstr=None)
+            # One reattach callable shared by the long-running loops, retried with backoff
+            reattach = _with_retry(functools.partial(
+                connect_to_edge_existing_tab, DELTA_TRADE_URL, reuse_playwright=playwright, first_attach=False
+            ))
 
             if args.action == "place":
                 if args.side and args.price is not None and args.lots is not None:
@@ -3190,7 +3796,6 @@ def main() -> int:
                     log(f"📊 State: {state.get('state')}, Orders: {len(state.get('orders', []))}, Next: {state.get('next_action')}")
             elif args.action == "strategymonitor":
                 log("🔄 Starting Strategy Monitor (continuous)...")
-                reattach = lambda: connect_to_edge_existing_tab(DELTA_TRADE_URL, reuse_playwright=playwright)
                 strategy_monitor_loop(page, reattach_cb=reattach)
             elif args.action == "test":
                 log("🧪 Running Comprehensive Strategy Tests...")
@@ -3207,7 +3812,7 @@ def main() -> int:
                 try:
                     pos_after = extract_position_data(page)
                     size_txt = pos_after.get("size") or ""
-                    still_open = re.search(r"[0-9]", size_txt) is not None
+                    still_open = _ANY_DIGIT_RE.search(size_txt) is not None
                 except Exception:
                     still_open = False
                 if (not result.get("success")) or still_open:
@@ -3220,8 +3825,7 @@ def main() -> int:
                 log(f"Result: {result}")
             else:
                 # Start monitoring positions
-                reattach = lambda: connect_to_edge_existing_tab(DELTA_TRADE_URL, reuse_playwright=playwright)
-                monitor_positions(page, reattach_cb=reattach)
+                monitor_positions(page, reattach_cb=reattach, interval=args.interval)
         except Exception as e:
             log(f"❌ Attach/monitor error: {e}")
             log("If Edge isn't in CDP mode, close Edge and start it like this:")